@@ -17,13 +17,15 @@ from app.db.models.account import Account
 from app.db.models.bank import Bank
 from app.db.models.base import BaseModel
 from app.db.models.card import Card
+from app.db.models.conversation import Conversation
 from app.db.models.transaction import Transaction
+from app.db.models.transaction_rollup import TransactionRollup
 from app.db.models.user import User
 
 config = context.config
 if config.config_file_name:
     fileConfig(config.config_file_name)
-models = [User, Account, Bank, Transaction, Card]
+models = [User, Account, Bank, Transaction, TransactionRollup, Card, Conversation]
 target_metadata = BaseModel.metadata
 
 
@@ -0,0 +1,46 @@
+"""add composite indexes for service queries
+
+Revision ID: 32acda282cc5
+Revises: ce5b88c05c2b
+Create Date: 2026-10-17 10:41:52.917340
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "32acda282cc5"
+down_revision: Union[str, Sequence[str], None] = "ce5b88c05c2b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_accounts_user_id_created_at",
+        "accounts",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_cards_account_id_status",
+        "cards",
+        ["account_id", "status"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_banks_is_active_name",
+        "banks",
+        ["is_active", "name"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_banks_is_active_name", table_name="banks")
+    op.drop_index("ix_cards_account_id_status", table_name="cards")
+    op.drop_index("ix_accounts_user_id_created_at", table_name="accounts")
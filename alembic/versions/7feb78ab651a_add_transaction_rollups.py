@@ -0,0 +1,118 @@
+"""add transaction rollups
+
+Revision ID: 7feb78ab651a
+Revises: b9fce890e5ea
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7feb78ab651a"
+down_revision: Union[str, Sequence[str], None] = "b9fce890e5ea"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "transaction_rollups",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "transaction_type",
+            postgresql.ENUM(
+                "DEPOSIT",
+                "WITHDRAWAL",
+                "TRANSFER",
+                "PAYMENT",
+                "REFUND",
+                "FEE",
+                name="transactiontype",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "COMPLETED",
+                "FAILED",
+                "CANCELLED",
+                "REVERSED",
+                name="transactionstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("total_absolute_amount", sa.Float(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_verified", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "account_id",
+            "day",
+            "transaction_type",
+            "status",
+            name="uq_transaction_rollups_bucket",
+        ),
+    )
+    op.create_index(
+        op.f("ix_transaction_rollups_id"), "transaction_rollups", ["id"], unique=False
+    )
+
+    # Backfill from the existing ledger with the same buckets as
+    # rebuild_transaction_rollups. The SHARE lock holds off new transactions
+    # until this migration commits, so none are missed or counted twice.
+    op.execute("LOCK TABLE transactions IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO transaction_rollups (
+            account_id,
+            day,
+            transaction_type,
+            status,
+            total_amount,
+            total_absolute_amount,
+            transaction_count
+        )
+        SELECT
+            account_id,
+            CAST(timezone('UTC', created_at) AS DATE),
+            transaction_type,
+            status,
+            sum(amount),
+            sum(abs(amount)),
+            count(*)
+        FROM transactions
+        GROUP BY
+            account_id,
+            CAST(timezone('UTC', created_at) AS DATE),
+            transaction_type,
+            status
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_transaction_rollups_id"), table_name="transaction_rollups")
+    op.drop_table("transaction_rollups")
@@ -0,0 +1,46 @@
+"""add transaction keyset pagination indexes
+
+Revision ID: ce5b88c05c2b
+Revises: 7feb78ab651a
+Create Date: 2026-10-17 10:03:17.284511
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ce5b88c05c2b"
+down_revision: Union[str, Sequence[str], None] = "7feb78ab651a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_transactions_account_id_created_at",
+        "transactions",
+        ["account_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_card_id_created_at",
+        "transactions",
+        ["card_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_created_at",
+        "transactions",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_transactions_created_at", table_name="transactions")
+    op.drop_index("ix_transactions_card_id_created_at", table_name="transactions")
+    op.drop_index("ix_transactions_account_id_created_at", table_name="transactions")
@@ -15,8 +15,8 @@ from app.services.account_service import (
     create_account,
     delete_account,
     get_account_by_id,
-    get_account_by_number,
-    get_all_accounts,
+    get_cached_account_by_number,
+    get_cached_user_accounts,
     update_account,
 )
 from app.services.email_service import send_email
@@ -54,7 +54,7 @@ async def get_all_user_accounts(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get all accounts for current user"""
-    accounts = await get_all_accounts(db, current_user.id)
+    accounts = await get_cached_user_accounts(db, current_user.id)
     return accounts
 
 
@@ -82,7 +82,7 @@ async def get_account_balance(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get account balance"""
-    account = await get_account_by_number(db, account_number)
+    account = await get_cached_account_by_number(db, account_number)
 
     if not account or account.user_id != current_user.id:
         raise HTTPException(
@@ -1,26 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_active_user, get_db
+from app.core.deps import get_agent_db, get_current_active_user
+from app.db.models.conversation import Conversation
 from app.db.models.user import User
 from app.schemas.agent import ChatRequest, ChatResponse
-from app.services.llm_agent import chat_with_agent_enhanced
+from app.services.conversation_service import get_conversation
+from app.services.llm_agent import chat_with_agent_enhanced, stream_chat_with_agent
 
 router = APIRouter(tags=["ai-agent"])
 
 
+async def _get_conversation(
+    db: AsyncSession, request: ChatRequest, user: User
+) -> Conversation | None:
+    """The conversation a message continues, or None to start a new one"""
+    if request.conversation_id is None:
+        return None
+    return await get_conversation(db, request.conversation_id, user.id)
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_agent_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Enhanced chat endpoint with real account data access"""
+    conversation = await _get_conversation(db, request, current_user)
     try:
-        response = await chat_with_agent_enhanced(request.message, db, current_user.id)
-        return ChatResponse(response=response)
+        return await chat_with_agent_enhanced(
+            request.message, db, current_user.id, conversation
+        )
     except Exception:
         raise HTTPException(
             status_code=500,
             detail="Unable to process your request at this time. Please try again later.",
         )
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_agent_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Chat endpoint that streams tokens and tool progress as server-sent events"""
+    conversation = await _get_conversation(db, request, current_user)
+    return StreamingResponse(
+        stream_chat_with_agent(request.message, db, current_user.id, conversation),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
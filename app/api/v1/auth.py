@@ -1,15 +1,17 @@
-from datetime import timedelta
-
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.core.config import settings
 from app.core.deps import get_current_active_user
-from app.core.security import create_access_token
+from app.core.security import jwt_keys
 from app.db.models.user import User
 from app.db.session import AsyncSession, get_db
-from app.schemas.user import Token, UserCreate, UserResponse
+from app.schemas.user import RefreshTokenRequest, Token, UserCreate, UserResponse
 from app.services.email_service import send_email
+from app.services.token_service import (
+    issue_tokens,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
 from app.services.user_service import (
     authenticate_user,
     change_user_password,
@@ -50,13 +52,27 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return await issue_tokens(user)
 
-    access_token = create_access_token(
-        data={"sub": user.email},
-        expires_delta=access_token_expires,
-    )
-    return Token(access_token=access_token, token_type="bearer")
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    token_data: RefreshTokenRequest, db: AsyncSession = Depends(get_db)
+) -> Token:
+    """Exchange a refresh token for a new access/refresh token pair."""
+    return await rotate_refresh_token(db, token_data.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token_data: RefreshTokenRequest):
+    """Revoke the refresh token and every token rotated from it."""
+    await revoke_refresh_token(token_data.refresh_token)
+
+
+@router.get("/jwks")
+async def get_jwks() -> dict:
+    """Public keys other services can use to verify our access tokens."""
+    return jwt_keys.jwks()
 
 
 @router.post("/{user_id}/change-password", status_code=status.HTTP_200_OK)
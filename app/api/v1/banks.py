@@ -8,8 +8,8 @@ from app.schemas.bank import BankCreate, BankListResponse, BankResponse, BankUpd
 from app.services.bank_service import (
     create_bank,
     delete_bank,
-    get_all_active_banks,
     get_bank_by_id,
+    get_cached_active_banks,
     update_bank,
 )
 
@@ -35,7 +35,7 @@ async def get_all_banks(
     current_user: User = Depends(get_current_active_user),
 ):
     "Get all active banks"
-    banks = await get_all_active_banks(db)
+    banks = await get_cached_active_banks(db)
     return BankListResponse(banks=banks, total=len(banks))
 
 
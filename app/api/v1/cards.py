@@ -1,6 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user, get_db
@@ -19,6 +27,7 @@ from app.services.card_service import (
     update_card_daily_limit,
 )
 from app.services.email_service import send_email
+from app.utils.helpers import next_cursor
 
 router = APIRouter(tags=["cards"])
 
@@ -84,12 +93,20 @@ async def get_card_details(
 @router.get("/{card_id}/transactions")
 async def get_card_transactions_history(
     card_id: int,
+    response: Response,
     limit: int = Query(10, le=50),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Get transactions for a specific card"""
-    transactions = await get_card_transactions(db, card_id, current_user.id, limit)
+    """Get transactions for a specific card, paged via the X-Next-Cursor header"""
+    transactions = await get_card_transactions(
+        db, card_id, current_user.id, limit, cursor
+    )
+
+    cursor = next_cursor(transactions, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
     return transactions
 
 
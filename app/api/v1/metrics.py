@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+
+from app.core.deps import get_current_superuser
+from app.core.security import password_hasher
+from app.db.session import get_pool_stats, get_replica_pool_stats
+from app.services.response_cache import agent_response_cache
+
+# Pool sizes and cache hit rates are operational detail - admins only
+router = APIRouter(tags=["metrics"], dependencies=[Depends(get_current_superuser)])
+
+
+@router.get("/pools")
+async def get_pool_metrics():
+    """Connection and password hash pool usage for the worker serving the call.
+
+    Each uvicorn worker has its own pools, so poll repeatedly (or scrape the
+    logfire metrics) to see every worker.
+    """
+    return {
+        "database_pool": get_pool_stats(),
+        "replica_pool": get_replica_pool_stats(),
+        "password_hash_pool": password_hasher.stats(),
+    }
+
+
+@router.get("/agent-cache")
+async def get_agent_cache_metrics():
+    """Hit rate of the agent response cache of the worker serving the call"""
+    return agent_response_cache.stats()
@@ -1,12 +1,24 @@
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import List, Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user, get_db
+from app.db.models.transaction import TransactionStatus
 from app.db.models.user import User
 from app.schemas.transaction import (
+    BatchTransferRequest,
+    BatchTransferResponse,
     DepositRequest,
     TransactionCreate,
     TransactionQuery,
@@ -21,13 +33,17 @@ from app.services.transaction_service import (
     create_interbank_transfer,
     create_transaction,
     deposit_funds,
+    export_user_transactions,
+    get_monthly_statement,
     get_transaction,
     get_transaction_summary,
     get_transactions,
     get_user_all_transactions,
     transfer_funds,
+    transfer_funds_batch,
     withdraw_funds,
 )
+from app.utils.helpers import next_cursor
 
 router = APIRouter(tags=["transactions"])
 
@@ -72,12 +88,18 @@ async def create_new_transaction(
 
 @router.get("/", response_model=List[TransactionResponse])
 async def get_all_transactions(
+    response: Response,
     account_id: int | None = None,
     limit: int = 50,
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Get transactions with filtering"""
+    """Get transactions with filtering, newest first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the
+    next page; the header is absent on the last page.
+    """
     if account_id:
         # Verify account belongs to user if specified
         account = await get_account_by_id(db, account_id)
@@ -85,15 +107,36 @@ async def get_all_transactions(
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Account not found"
             )
-        query = TransactionQuery(account_id=account_id, limit=limit)
+        query = TransactionQuery(account_id=account_id, limit=limit, cursor=cursor)
         transactions = await get_transactions(db, query)
     else:
-        # Use the renamed function for user transactions
-        transactions = await get_user_all_transactions(db, current_user.id, limit)
+        transactions = await get_user_all_transactions(
+            db, current_user.id, limit, cursor
+        )
 
+    cursor = next_cursor(transactions, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
     return transactions
 
 
+@router.get("/export")
+async def export_transactions(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Stream the current user's full transaction history as CSV or NDJSON"""
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_user_transactions(db, current_user.id, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{export_format}"'
+        },
+    )
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction_by_id(
     transaction_id: int,
@@ -115,6 +158,9 @@ async def get_transaction_by_id(
 @router.get("/summary/{account_id}")
 async def get_account_transaction_summary(
     account_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    transaction_status: TransactionStatus | None = Query(None, alias="status"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
@@ -126,10 +172,32 @@ async def get_account_transaction_summary(
             status_code=status.HTTP_404_NOT_FOUND, detail="Account not found"
         )
 
-    summary = await get_transaction_summary(db, account_id)
+    summary = await get_transaction_summary(
+        db, account_id, start_date, end_date, transaction_status
+    )
     return summary
 
 
+@router.get("/statement/{account_id}")
+async def get_account_monthly_statement(
+    account_id: int,
+    year: int = Query(..., ge=1970),
+    month: int = Query(..., ge=1, le=12),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get monthly statement totals for an account"""
+    # Verify account belongs to user
+    account = await get_account_by_id(db, account_id)
+    if not account or account.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Account not found"
+        )
+
+    statement = await get_monthly_statement(db, account_id, year, month)
+    return statement
+
+
 @router.delete("/{transaction_id}")
 async def delete_transaction_by_id(
     transaction_id: int,
@@ -208,3 +276,18 @@ async def transfer_from_account(
     """Transfer funds between accounts"""
     result = await transfer_funds(db, transfer_data, current_user.id)
     return {"message": "Transfer completed successfully", "details": result}
+
+
+@router.post(
+    "/transfers/batch",
+    response_model=BatchTransferResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def batch_transfer_from_accounts(
+    batch_data: BatchTransferRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Apply many transfers atomically in a single request"""
+    result = await transfer_funds_batch(db, batch_data.transfers, current_user.id)
+    return result
@@ -1,63 +1,419 @@
+import asyncio
 import json
-from typing import Any, Optional
+import math
+import random
+import struct
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
 
+import logfire
 import redis.asyncio as redis
 
+from app.core.cache_codec import get_codec
 from app.core.config import settings
 
+# Load time and expiry stored in front of values written by get_or_load
+_ENVELOPE = struct.Struct("!dd")
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Bumped on every eviction so in-flight Redis reads can tell that the
+        # value they fetched may already be stale
+        self.version = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expire: int | None = None) -> None:
+        ttl = min(expire, self.ttl) if expire else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        self.version += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.version += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class RedisCache:
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
+        self.codec = get_codec(settings.CACHE_CODEC, settings.CACHE_COMPRESS_MIN_BYTES)
+        self.local = LocalCache(
+            settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_TTL_SECONDS
+        )
+        # Identifies this worker so it can skip its own invalidation messages
+        self.instance_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        # Loads currently running in this worker, keyed by cache key
+        self._inflight: dict[str, asyncio.Future] = {}
 
     async def init_cache(self):
         """Initialize Redis connection"""
-        self.redis = redis.from_url(
-            settings.REDIS_URL, encoding="utf-8", decode_responses=True
-        )
+        # Values are codec-encoded bytes, so responses are not decoded to str
+        self.redis = redis.from_url(settings.REDIS_URL)
         # Test connection
         await self.redis.ping()
 
-    async def get(self, key: str) -> Optional[str]:
-        """Get value from cache"""
+        # Subscribe before serving so no invalidation published after startup
+        # can be missed by this worker
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+        self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def close(self) -> None:
+        """Close Redis connection"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
         if self.redis:
-            return await self.redis.get(key)
-        return None
+            await self.redis.aclose()
+            self.redis = None
+
+        self.local.clear()
+
+    async def _listen_for_invalidations(self) -> None:
+        """Evict local entries that another worker invalidated"""
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    try:
+                        payload = json.loads(message["data"])
+                        origin, keys = payload["origin"], payload["keys"]
+                    except (ValueError, KeyError, TypeError) as e:
+                        # One bad message must not stop the listener
+                        logfire.warn("Malformed cache invalidation", error=str(e))
+                        continue
+
+                    if origin != self.instance_id:
+                        self.local.delete(*keys)
+            except redis.RedisError as e:
+                # Messages published while disconnected are lost, so nothing
+                # held locally can be trusted any more
+                logfire.warn("Cache invalidation listener failed", error=str(e))
+                self.local.clear()
+                await asyncio.sleep(1)
 
-    async def set(self, key: str, value: str, expire: int = None) -> None:
+    async def get(self, key: str, local: bool = False) -> Optional[bytes]:
+        """Get value from cache, checking the in-process tier first if asked"""
+        if not self.redis:
+            return None
+
+        if local:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
+        version = self.local.version
+        try:
+            value = await self.redis.get(key)
+        except redis.RedisError as e:
+            # A cache outage must never fail the request - treat it as a miss
+            logfire.warn("Cache get failed", key=key, error=str(e))
+            return None
+
+        # Skip the local copy if anything was invalidated while we waited
+        if local and value is not None and version == self.local.version:
+            self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: bytes, expire: int = None) -> None:
         """Set value in cache"""
         if self.redis:
             expire = expire or settings.CACHE_EXPIRE_SECONDS
-            await self.redis.setex(key, expire, value)
+            try:
+                await self.redis.setex(key, expire, value)
+            except redis.RedisError as e:
+                logfire.warn("Cache set failed", key=key, error=str(e))
 
-    async def get_json(self, key: str) -> Optional[Any]:
-        """Get JSON value from cache"""
-        value = await self.get(key)
+    async def get_value(
+        self,
+        key: str,
+        type_: Any = None,
+        local: bool = False,
+        namespace: str | None = None,
+    ) -> Optional[Any]:
+        """Get a decoded value from cache, optionally scoped to a namespace.
+
+        With ``type_`` (e.g. ``list[AccountResponse]``) the payload is
+        validated straight into that type instead of plain dicts.
+        """
+        if namespace:
+            key = await self.namespaced_key(namespace, key)
+            if key is None:
+                return None
+
+        value = await self.get(key, local=local)
         if value:
-            return json.loads(value)
+            try:
+                return self.codec.decode(value, type_)
+            except Exception as e:
+                logfire.warn("Cache decode failed", key=key, error=str(e))
+                self.local.delete(key)
         return None
 
-    async def set_json(self, key: str, value: Any, expire: int = None) -> None:
-        """Set JSON value in cache"""
-        await self.set(key, json.dumps(value), expire)
+    async def set_value(
+        self, key: str, value: Any, expire: int = None, namespace: str | None = None
+    ) -> None:
+        """Encode and set a value (Pydantic models included) in cache"""
+        if namespace:
+            key = await self.namespaced_key(namespace, key)
+            if key is None:
+                return
 
-    async def delete(self, key: str) -> None:
-        """Delete key from cache"""
-        if self.redis:
-            await self.redis.delete(key)
+        await self.set(key, self.codec.encode(value), expire)
+
+    # ------------------------
+    # 🚦 Single-flight Loading
+    # ------------------------
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        type_: Any = None,
+        expire: int = None,
+        local: bool = False,
+        namespace: str | None = None,
+        early_refresh: bool = False,
+    ) -> Any:
+        """Get a value from cache, loading it at most once per worker.
+
+        Concurrent misses for the same key wait for a single ``loader`` call
+        instead of each querying the database. With ``early_refresh`` a hit
+        may be treated as a miss shortly before the entry expires (XFetch), so
+        a hot key is usually reloaded by one request before it runs out.
+        ``None`` results are returned but never cached; hits are decoded as
+        ``type_``, which should match what ``loader`` returns. Entries that
+        fail to decode are treated as misses and overwritten.
+        """
+        if namespace:
+            key = await self.namespaced_key(namespace, key)
+        if key is None:
+            return await loader()
+
+        while True:
+            value = await self.get(key, local=local)
+            if value:
+                try:
+                    delta, expires_at = _ENVELOPE.unpack_from(value)
+                    if not (
+                        early_refresh and self._should_refresh_early(delta, expires_at)
+                    ):
+                        return self.codec.decode(value[_ENVELOPE.size :], type_)
+                except Exception as e:
+                    # Truncated or written by another codec - reload and overwrite
+                    logfire.warn("Cache decode failed", key=key, error=str(e))
+                    self.local.delete(key)
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The loading request went away - try again, possibly as leader
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader, expire)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn if there are none
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[Any]], expire: int | None
+    ) -> Any:
+        expire = expire or settings.CACHE_EXPIRE_SECONDS
+        started = time.monotonic()
+        value = await loader()
+        if value is not None:
+            envelope = _ENVELOPE.pack(time.monotonic() - started, time.time() + expire)
+            await self.set(key, envelope + self.codec.encode(value), expire)
+        return value
+
+    @staticmethod
+    def _should_refresh_early(delta: float, expires_at: float) -> bool:
+        # The closer to expiry and the slower the load, the likelier a refresh
+        gap = delta * settings.CACHE_EARLY_REFRESH_BETA
+        jitter = -math.log(1.0 - random.random())
+        return time.time() + gap * jitter >= expires_at
+
+    async def delete(self, *keys: str) -> None:
+        """Delete keys from cache and evict them from every worker"""
+        if self.redis and keys:
+            self.local.delete(*keys)
+            message = json.dumps({"origin": self.instance_id, "keys": list(keys)})
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    # UNLINK frees the memory off the main Redis thread
+                    pipe.unlink(*keys)
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, message)
+                    await pipe.execute()
+            except redis.RedisError as e:
+                logfire.warn("Cache delete failed", keys=keys, error=str(e))
 
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
-        if self.redis:
+        if not self.redis:
+            return False
+
+        try:
             return await self.redis.exists(key) == 1
-        return False
+        except redis.RedisError as e:
+            logfire.warn("Cache exists failed", key=key, error=str(e))
+            return False
 
-    async def clear_pattern(self, pattern: str) -> None:
-        """Clear keys matching pattern"""
-        if self.redis:
-            keys = await self.redis.keys(pattern)
-            if keys:
-                await self.redis.delete(*keys)
+    async def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Clear keys matching pattern without blocking Redis.
+
+        Keys are found with incremental ``SCAN`` calls and removed in batches,
+        so Redis keeps serving other clients between batches. Prefer
+        ``invalidate_namespace`` for data that can be grouped up front.
+        """
+        if not self.redis:
+            return 0
+
+        with logfire.span("cache_clear_pattern", pattern=pattern):
+            deleted = 0
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern, count=batch_size):
+                batch.append(key.decode())
+                if len(batch) >= batch_size:
+                    await self.delete(*batch)
+                    deleted += len(batch)
+                    batch = []
+
+            if batch:
+                await self.delete(*batch)
+                deleted += len(batch)
+            return deleted
+
+    # ------------------------
+    # 🏷️ Versioned Namespaces
+    # ------------------------
+
+    @staticmethod
+    def _generation_key(namespace: str) -> str:
+        return f"gen:{namespace}"
+
+    @staticmethod
+    def _generation_seed() -> int:
+        # If Redis evicts a generation counter, restarting it from the clock
+        # keeps it from reusing a generation whose keys may still be cached
+        return time.time_ns() // 1000
+
+    async def generation(self, namespace: str) -> Optional[int]:
+        """Current generation of a namespace, or None if Redis is unavailable"""
+        if not self.redis:
+            return None
+
+        generation_key = self._generation_key(namespace)
+        generation = self.local.get(generation_key)
+        if generation is None:
+            version = self.local.version
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.set(generation_key, self._generation_seed(), nx=True)
+                    pipe.get(generation_key)
+                    _, generation = await pipe.execute()
+            except redis.RedisError as e:
+                logfire.warn(
+                    "Cache generation lookup failed", namespace=namespace, error=str(e)
+                )
+                return None
+
+            generation = int(generation)
+            if version == self.local.version:
+                self.local.set(generation_key, generation)
+
+        return generation
+
+    async def namespaced_key(self, namespace: str, key: str) -> Optional[str]:
+        """Build the key for the current generation of a namespace"""
+        generation = await self.generation(namespace)
+        if generation is None:
+            return None
+        return f"{namespace}:v{generation}:{key}"
+
+    async def invalidate_namespace(self, *namespaces: str) -> None:
+        """Invalidate every key in the namespaces by moving to a new generation.
+
+        This is O(1) per namespace: keys from older generations are no longer
+        addressable and simply expire with their TTL.
+        """
+        if not self.redis or not namespaces:
+            return
+
+        generation_keys = [self._generation_key(namespace) for namespace in namespaces]
+        self.local.delete(*generation_keys)
+        message = json.dumps({"origin": self.instance_id, "keys": generation_keys})
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for generation_key in generation_keys:
+                    pipe.set(generation_key, self._generation_seed(), nx=True)
+                    pipe.incr(generation_key)
+                pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, message)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logfire.warn(
+                "Cache namespace invalidation failed",
+                namespaces=namespaces,
+                error=str(e),
+            )
 
 
 # Global cache instance
@@ -0,0 +1,104 @@
+import zlib
+from functools import lru_cache
+from typing import Any, Protocol
+
+from pydantic import TypeAdapter
+from pydantic_core import from_json, to_json, to_jsonable_python
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+class CacheCodec(Protocol):
+    """Turns cached values into bytes and back.
+
+    ``encode`` accepts Pydantic models (or lists/dicts of them) directly.
+    ``decode`` returns plain Python data, or validates straight into
+    ``type_`` (e.g. ``list[AccountResponse]``) when one is given.
+    """
+
+    def encode(self, value: Any) -> bytes: ...
+
+    def decode(self, data: bytes, type_: Any = None) -> Any: ...
+
+
+@lru_cache(maxsize=256)
+def _adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+class JsonCodec:
+    """JSON bytes produced by pydantic-core, without intermediate dicts"""
+
+    def encode(self, value: Any) -> bytes:
+        return to_json(value)
+
+    def decode(self, data: bytes, type_: Any = None) -> Any:
+        if type_ is None:
+            return from_json(data)
+        return _adapter(type_).validate_json(data)
+
+
+class MsgpackCodec:
+    """MessagePack bytes; smaller than JSON for numeric-heavy payloads"""
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError(
+                "CACHE_CODEC=msgpack requires the msgpack package "
+                "(pip install 'bank-support-agent[cache]')"
+            )
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(to_jsonable_python(value))
+
+    def decode(self, data: bytes, type_: Any = None) -> Any:
+        value = msgpack.unpackb(data)
+        if type_ is None:
+            return value
+        return _adapter(type_).validate_python(value)
+
+
+class CompressedCodec:
+    """Wraps a codec and zlib-compresses payloads above ``min_size`` bytes.
+
+    Every payload starts with a flag byte, so compressed and uncompressed
+    entries can be read back regardless of the current threshold.
+    """
+
+    _RAW = b"\x00"
+    _ZLIB = b"\x01"
+
+    def __init__(self, codec: CacheCodec, min_size: int, level: int = 6):
+        self.codec = codec
+        self.min_size = min_size
+        self.level = level
+
+    def encode(self, value: Any) -> bytes:
+        data = self.codec.encode(value)
+        if self.min_size and len(data) >= self.min_size:
+            return self._ZLIB + zlib.compress(data, self.level)
+        return self._RAW + data
+
+    def decode(self, data: bytes, type_: Any = None) -> Any:
+        flag, payload = data[:1], data[1:]
+        if flag == self._ZLIB:
+            payload = zlib.decompress(payload)
+        return self.codec.decode(payload, type_)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def get_codec(name: str, compress_min_size: int = 0) -> CacheCodec:
+    """Build the configured cache codec"""
+    try:
+        codec = CODECS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown cache codec: {name}") from None
+    return CompressedCodec(codec, compress_min_size)
@@ -21,15 +21,54 @@ class GlobalConfig(BaseConfig):
 
     # Database
     DATABASE_URL: str
+    # Optional streaming replica for reads that tolerate replication lag
+    READ_REPLICA_URL: str | None = None
+    # Pool sizes are per worker: workers * (size + overflow) <= max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 0 leaves the server default in place
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_ECHO: bool = False
+    # Prepared statements kept per connection, so repeats skip parse/plan
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # Compiled SQL strings kept per engine, so repeats skip SQL compilation
+    DB_QUERY_CACHE_SIZE: int = 500
+    # Behind PgBouncer in transaction mode: no named/cached prepared statements
+    DB_PGBOUNCER: bool = False
+    # Return connections to the pool between reads instead of at response end;
+    # costs a COMMIT (and a pre-ping) per read, frees connections under load.
+    # Agent chat sessions always do this, as they idle while the model runs
+    DB_RELEASE_IDLE_CONNECTIONS: bool = False
 
     # AI/ML
     PYDANTIC_AI_MODEL: str | None = None
     DEEPSEEK_API_KEY: str | None = None
     DEEPSEEK_URL: str | None = None
+    # Approximate tokens of conversation history replayed with each message
+    AGENT_HISTORY_MAX_TOKENS: int = 4000
+    # Tool outputs of earlier turns are cut to this many characters
+    AGENT_HISTORY_TOOL_OUTPUT_CHARS: int = 1000
+    # Answers to questions that don't depend on the user are reused
+    AGENT_RESPONSE_CACHE_ENABLED: bool = True
+    AGENT_RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    AGENT_RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    # Cosine similarity (0-1) a new question needs to reuse a cached answer
+    AGENT_RESPONSE_CACHE_SIMILARITY: float = 0.85
 
     # Redis
     REDIS_URL: str | None = None
     CACHE_EXPIRE_SECONDS: int = 300
+    CACHE_CODEC: Literal["json", "msgpack"] = "json"
+    # Values at least this large are zlib-compressed; 0 disables compression
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+    LOCAL_CACHE_MAX_ENTRIES: int = 1024
+    LOCAL_CACHE_TTL_SECONDS: int = 30
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    # XFetch beta: > 1 refreshes earlier, 0 disables early refresh
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
 
     # Logging
     LOGFIRE_TOKEN: str | None = None
@@ -37,8 +76,21 @@ class GlobalConfig(BaseConfig):
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ALGORITHM: str = "HS256"
+    # PEM text or file path for RS256/ES256/EdDSA; HS* algorithms use SECRET_KEY.
+    # A public key alone is enough to verify tokens issued elsewhere.
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    JWT_KEY_ID: str | None = None
+    TOKEN_VERIFY_CACHE_SIZE: int = 4096
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24
+    # bcrypt runs off the event loop; "thread" suffices as bcrypt drops the GIL
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    # Hash requests allowed to wait for a worker before new ones get a 503
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # How long an authenticated user may be served without a DB lookup
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
 
     # App
     PORT: int = 8000
@@ -7,8 +7,9 @@ from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
 from app.core.security import verify_token
 from app.db.models.user import User
-from app.db.session import AsyncSession, get_db
-from app.services.user_service import get_user_by_email
+from app.db.session import AsyncSession, LazySession, get_db
+from app.services.token_service import get_principal_from_claims
+from app.services.user_service import get_cached_principal
 
 logfire.configure(token=settings.LOGFIRE_TOKEN)
 logfire.instrument_pydantic_ai()
@@ -25,11 +26,22 @@ def credentials_exception(detail: str) -> HTTPException:
     )
 
 
+async def get_agent_db(db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """The request session, returning its connection to the pool after each
+    read: agent chats spend most of their time waiting on the model"""
+    if isinstance(db, LazySession):
+        await db.release_between_reads()
+    return db
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_db)
 ) -> User:
     token_data = verify_token(token)
-    user = await get_user_by_email(db, token_data.email)
+    # Fast path: current claims embedded in the token, no DB or cache lookup
+    user = await get_principal_from_claims(token_data)
+    if user is None:
+        user = await get_cached_principal(db, token_data.email)
 
     if user is None:
         raise credentials_exception("Could not find user for this token")
@@ -42,3 +54,13 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
             status_code=status.HTTP_404_NOT_FOUND, detail="Inactive user"
         )
     return current_user
+
+
+async def get_current_superuser(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized"
+        )
+    return current_user
@@ -1,10 +1,16 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
 
 import jwt
 
 # configure logfire
 import logfire
 from fastapi import HTTPException, status
+from jwt.algorithms import get_default_algorithms
 from passlib.context import CryptContext
 
 from app.core.config import settings
@@ -16,6 +22,90 @@ logfire.instrument_pydantic_ai()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+# ------------------------
+# 🗝️ JWT Keys
+# ------------------------
+
+
+def _read_pem(value: str) -> bytes:
+    """Accept PEM text directly or a path to a PEM file"""
+    if value.lstrip().startswith("-----BEGIN"):
+        return value.encode()
+    with open(value, "rb") as pem_file:
+        return pem_file.read()
+
+
+class JWTKeys:
+    """Signing and verification keys, parsed once instead of on every request"""
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str | None = None,
+        private_key: str | None = None,
+        public_key: str | None = None,
+        key_id: str | None = None,
+    ):
+        self.algorithm = algorithm
+        self.key_id = key_id
+        self._algorithm = get_default_algorithms()[algorithm]
+        self.symmetric = algorithm.startswith("HS")
+
+        if self.symmetric:
+            self.signing_key = self._algorithm.prepare_key(secret)
+            self.verification_key = self.signing_key
+            return
+
+        if not private_key and not public_key:
+            raise RuntimeError(
+                f"{algorithm} requires JWT_PRIVATE_KEY and/or JWT_PUBLIC_KEY"
+            )
+        self.signing_key = (
+            self._algorithm.prepare_key(_read_pem(private_key)) if private_key else None
+        )
+        self.verification_key = (
+            self._algorithm.prepare_key(_read_pem(public_key))
+            if public_key
+            else self.signing_key.public_key()
+        )
+
+    def encode(self, payload: dict) -> str:
+        if self.signing_key is None:
+            raise RuntimeError("No JWT_PRIVATE_KEY configured to sign tokens")
+        headers = {"kid": self.key_id} if self.key_id else None
+        return jwt.encode(
+            payload, self.signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self.verification_key, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict:
+        """Public keys as a JWK set; empty for shared-secret algorithms"""
+        if self.symmetric:
+            return {"keys": []}
+
+        jwk = self._algorithm.to_jwk(self.verification_key, as_dict=True)
+        jwk.update({"alg": self.algorithm, "use": "sig"})
+        if self.key_id:
+            jwk["kid"] = self.key_id
+        return {"keys": [jwk]}
+
+
+jwt_keys = JWTKeys(
+    settings.ALGORITHM,
+    secret=settings.SECRET_KEY,
+    private_key=settings.JWT_PRIVATE_KEY,
+    public_key=settings.JWT_PUBLIC_KEY,
+    key_id=settings.JWT_KEY_ID,
+)
+
+
+# ------------------------
+# 🎫 Tokens
+# ------------------------
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Create access token"""
     to_encode = data.copy()
@@ -26,9 +116,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    encoded_jwt = jwt_keys.encode(to_encode)
     return encoded_jwt
 
 
@@ -40,37 +128,96 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
     else:
         expire = datetime.now(timezone.utc) + timedelta(days=7)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    encoded_jwt = jwt_keys.encode(to_encode)
     return encoded_jwt
 
 
-def verify_token(token: str) -> TokenData:
+def _credentials_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not verify credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return TokenData(email=email)
+        return jwt_keys.decode(token)
     except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error("Token has expired")
     except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not verify credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error("Could not verify credentials")
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of access tokens whose signature was already checked.
+
+    Entries are only served until the token's ``exp``, so a cached token
+    never outlives its own expiry.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, TokenData]] = OrderedDict()
+
+    def get(self, token: str) -> TokenData | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+
+        expires_at, token_data = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+
+        self._entries.move_to_end(token)
+        return token_data
+
+    def set(self, token: str, expires_at: float, token_data: TokenData) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[token] = (expires_at, token_data)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.TOKEN_VERIFY_CACHE_SIZE)
+
+
+def verify_token(token: str) -> TokenData:
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        return cached
+
+    payload = _decode_token(token)
+    email: str = payload.get("sub")
+    # Refresh tokens are only accepted by /auth/refresh
+    if email is None or payload.get("type") == "refresh":
+        raise _credentials_error("Could not verify credentials")
+
+    token_data = TokenData(
+        email=email,
+        user_id=payload.get("uid"),
+        full_name=payload.get("name"),
+        is_active=payload.get("active"),
+        is_superuser=payload.get("su"),
+        roles=payload.get("roles") or [],
+        generation=payload.get("gen"),
+    )
+    verified_tokens.set(token, payload["exp"], token_data)
+    return token_data
+
+
+def verify_refresh_token(token: str) -> dict:
+    """Decode a refresh token and return its claims"""
+    payload = _decode_token(token)
+    if payload.get("type") != "refresh" or not payload.get("jti"):
+        raise _credentials_error("Invalid refresh token")
+    return payload
 
 
 def get_password_hash(password: str) -> str:
@@ -81,3 +228,114 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# ------------------------
+# 🔐 Password Hashing Pool
+# ------------------------
+
+
+class PasswordHashPool:
+    """Runs bcrypt on a bounded executor so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once and at most ``max_pending`` wait
+    for a slot; beyond that callers get a 503 instead of queueing without
+    bound during a login burst.
+    """
+
+    def __init__(self, executor_type: str, workers: int, max_pending: int):
+        self.executor_type = executor_type
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.peak_pending = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._queue_depth = logfire.metric_up_down_counter(
+            "password_hash.queue_depth",
+            description="Password hash requests waiting for a worker",
+        )
+        self._wait_time = logfire.metric_histogram(
+            "password_hash.wait_time",
+            unit="ms",
+            description="Time password hash requests waited for a worker",
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking hash function on the pool"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logfire.warn("Password hash queue full", pending=self.pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        queued_at = time.monotonic()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        self._queue_depth.add(1)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.pending -= 1
+            self._queue_depth.add(-1)
+
+        self._wait_time.record((time.monotonic() - queued_at) * 1000)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Current pool usage for metrics endpoints"""
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.pending,
+            "peak_queue_depth": self.peak_pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHashPool(
+    settings.PASSWORD_HASH_EXECUTOR,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
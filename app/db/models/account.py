@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
@@ -24,6 +24,10 @@ class AccountStatus(enum.Enum):
 
 class Account(BaseModel):
     __tablename__ = "accounts"
+    __table_args__ = (
+        # get_all_accounts: WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_accounts_user_id_created_at", "user_id", "created_at"),
+    )
 
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Text
+from sqlalchemy import Boolean, Column, Index, String, Text
 from sqlalchemy.orm import relationship
 
 from app.db.models.base import BaseModel
@@ -6,6 +6,10 @@ from app.db.models.base import BaseModel
 
 class Bank(BaseModel):
     __tablename__ = "banks"
+    __table_args__ = (
+        # get_all_active_banks: WHERE is_active ORDER BY name
+        Index("ix_banks_is_active_name", "is_active", "name"),
+    )
 
     name = Column(String(255), nullable=False, index=True)
     code = Column(String(50), unique=True, nullable=False)  # Bank code -CBE
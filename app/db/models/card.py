@@ -1,6 +1,15 @@
 import enum
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
@@ -24,6 +33,10 @@ class CardStatus(enum.Enum):
 
 class Card(BaseModel):
     __tablename__ = "cards"
+    __table_args__ = (
+        # get_user_cards joins cards to the user's accounts
+        Index("ix_cards_account_id_status", "account_id", "status"),
+    )
 
     account_id = Column(
         Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
@@ -0,0 +1,18 @@
+from sqlalchemy import JSON, Column, ForeignKey, Integer
+
+from app.db.models.base import BaseModel
+
+
+class Conversation(BaseModel):
+    """Agent chat history, replayed on the next message of the conversation"""
+
+    __tablename__ = "conversations"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # pydantic-ai messages, trimmed to the history token budget
+    messages = Column(JSON, default=list, nullable=False)
+
+    def __repr__(self):
+        return f"<Conversation(id={self.id}, user_id={self.user_id})>"
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
@@ -26,6 +26,14 @@ class TransactionStatus(enum.Enum):
 
 class Transaction(BaseModel):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset pagination indexes, newest first over (created_at, id)
+        Index(
+            "ix_transactions_account_id_created_at", "account_id", "created_at", "id"
+        ),
+        Index("ix_transactions_card_id_created_at", "card_id", "created_at", "id"),
+        Index("ix_transactions_created_at", "created_at", "id"),
+    )
 
     account_id = Column(
         Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
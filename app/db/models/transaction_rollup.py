@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Enum as SQLEnum
+
+from app.db.models.base import BaseModel
+from app.db.models.transaction import TransactionStatus, TransactionType
+
+
+class TransactionRollup(BaseModel):
+    """Pre-aggregated transaction totals per account, day, type and status"""
+
+    __tablename__ = "transaction_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "account_id",
+            "day",
+            "transaction_type",
+            "status",
+            name="uq_transaction_rollups_bucket",
+        ),
+    )
+
+    account_id = Column(
+        Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    day = Column(Date, nullable=False)
+    transaction_type = Column(SQLEnum(TransactionType), nullable=False)
+    status = Column(SQLEnum(TransactionStatus), nullable=False)
+    total_amount = Column(Float, default=0.0, nullable=False)
+    total_absolute_amount = Column(Float, default=0.0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<TransactionRollup(account_id={self.account_id}, day={self.day}, type={self.transaction_type})>"
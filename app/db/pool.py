@@ -0,0 +1,83 @@
+import bisect
+import os
+import time
+
+import logfire
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (ms) of the checkout wait-time buckets; the last one is open
+WAIT_TIME_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_checkout_wait = logfire.metric_histogram(
+    "db.pool.checkout_wait",
+    unit="ms",
+    description="Time spent waiting for a pooled database connection",
+)
+
+
+class WaitTimeHistogram:
+    """Cumulative histogram of connection checkout wait times"""
+
+    def __init__(self, buckets: tuple[float, ...] = WAIT_TIME_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, wait_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, wait_ms)] += 1
+        self.count += 1
+        self.total_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long checkouts wait.
+
+    The wait includes opening a new connection when the pool grows into its
+    overflow, which is the latency a request actually sees.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = WaitTimeHistogram()
+        self.timeouts = 0
+        self.peak_checked_out = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait_ms = (time.perf_counter() - started) * 1000
+            self.wait_time.record(wait_ms)
+            _checkout_wait.record(wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+
+    def stats(self) -> dict:
+        """Usage of this worker's pool"""
+        return {
+            "pid": os.getpid(),
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "peak_checked_out": self.peak_checked_out,
+            "timeouts": self.timeouts,
+            "wait_time": self.wait_time.snapshot(),
+        }
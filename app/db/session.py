@@ -1,22 +1,246 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import functools
+import uuid
+from contextlib import contextmanager
 
-from app.core.config import settings
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+
+from app.core.config import GlobalConfig, settings
 from app.db.models.base import Base
+from app.db.pool import InstrumentedAsyncPool
+
+
+def _unique_statement_name() -> str:
+    # PgBouncer may hand each transaction a different server connection, so
+    # statement names must never collide with ones prepared by another client
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def _connect_args(config: GlobalConfig) -> dict:
+    connect_args = {}
+    if config.DB_PGBOUNCER:
+        connect_args.update(
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+            statement_cache_size=0,  # asyncpg's own cache
+        )
+    else:
+        connect_args["prepared_statement_cache_size"] = (
+            config.DB_PREPARED_STATEMENT_CACHE_SIZE
+        )
+
+    if config.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)
+        }
+    return connect_args
+
+
+def build_engine(
+    config: GlobalConfig = settings, url: str | None = None
+) -> AsyncEngine:
+    """Create an engine from the DB_* settings"""
+    return create_async_engine(
+        url or config.DATABASE_URL,
+        echo=config.DB_ECHO,
+        future=True,
+        poolclass=InstrumentedAsyncPool,
+        pool_pre_ping=config.DB_POOL_PRE_PING,  # detect dead/stale connections
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,  # allow temporary spikes
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        query_cache_size=config.DB_QUERY_CACHE_SIZE,
+        connect_args=_connect_args(config),
+    )
+
+
+# ------------------------
+# 🔀 Read Replica Routing
+# ------------------------
+#
+# Reads wrapped in use_replica() go to the replica. Once a session writes,
+# everything it runs afterwards stays on the primary, so a request always
+# sees its own writes. Writes committed by earlier requests may not have
+# reached the replica yet; only route reads that tolerate that lag.
+# Cache loaders don't: they run right after an invalidation and would store
+# the lagging rows for the whole TTL, so they read inside use_primary().
+
+_REPLICA_READS = "replica_reads"
+_PRIMARY_READS = "primary_reads"
+_WROTE = "wrote_to_primary"
+# Set while the current transaction has written or locked rows
+_HOLDS_LOCKS = "transaction_holds_locks"
+
+
+class RoutingSession(Session):
+    """Session that sends marked reads to a replica until it writes"""
+
+    def __init__(self, *args, replica_bind: AsyncEngine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_engine = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica_engine is not None
+            and self.info.get(_REPLICA_READS)
+            and not self.info.get(_PRIMARY_READS)
+            and not self.info.get(_WROTE)
+            and not self._flushing
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return self.replica_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary_after_flush(session, flush_context):
+    session.info[_WROTE] = True
+    session.info[_HOLDS_LOCKS] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _stick_to_primary_after_write(orm_execute_state):
+    info = orm_execute_state.session.info
+    if not orm_execute_state.is_select:
+        info[_WROTE] = True
+        info[_HOLDS_LOCKS] = True
+    elif getattr(orm_execute_state.statement, "_for_update_arg", None) is not None:
+        info[_HOLDS_LOCKS] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _forget_locks(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_HOLDS_LOCKS, None)
+
+
+@contextmanager
+def use_replica(db: AsyncSession):
+    """Route the reads made inside the block to the read replica"""
+    db.info[_REPLICA_READS] = db.info.get(_REPLICA_READS, 0) + 1
+    try:
+        yield db
+    finally:
+        db.info[_REPLICA_READS] -= 1
+
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True,
-    pool_pre_ping=True,  # detect dead/stale connections
-    pool_size=5,  # small pool
-    max_overflow=10,  # allow temporary spikes
+@contextmanager
+def use_primary(db: AsyncSession):
+    """Route the reads made inside the block to the primary, even within
+    use_replica()"""
+    db.info[_PRIMARY_READS] = db.info.get(_PRIMARY_READS, 0) + 1
+    try:
+        yield db
+    finally:
+        db.info[_PRIMARY_READS] -= 1
+
+
+def replica_read(func):
+    """Run a read-only service function, whose first argument is the session,
+    on the read replica"""
+
+    @functools.wraps(func)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        with use_replica(db):
+            return await func(db, *args, **kwargs)
+
+    return wrapper
+
+
+# ------------------------
+# 💤 Idle Connection Release
+# ------------------------
+
+
+class LazySession(AsyncSession):
+    """Session that can hand its connection back to the pool between reads.
+
+    With release_when_idle, after each execute, scalar or get a transaction
+    that has not written, locked rows or left pending changes is committed,
+    returning its connection instead of keeping it idle until the response
+    is sent. That costs a COMMIT per read, so request sessions leave it off
+    unless DB_RELEASE_IDLE_CONNECTIONS is set or the route uses get_agent_db.
+    stream() is not covered: a server-side cursor needs its connection until
+    it is exhausted.
+    """
+
+    sync_session_class = RoutingSession
+
+    def __init__(self, *args, release_when_idle: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release_when_idle = release_when_idle
+
+    async def _release_if_idle(self) -> None:
+        if (
+            self.release_when_idle
+            and self.in_transaction()
+            and not self.in_nested_transaction()
+            and not self.sync_session.expire_on_commit
+            and not self.info.get(_HOLDS_LOCKS)
+            and not (self.new or self.dirty or self.deleted)
+        ):
+            await self.commit()
+
+    async def release_between_reads(self) -> None:
+        """Turn release_when_idle on, handing back a connection held now"""
+        self.release_when_idle = True
+        await self._release_if_idle()
+
+    async def execute(self, statement, *args, **kwargs):
+        result = await super().execute(statement, *args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def scalar(self, statement, *args, **kwargs):
+        result = await super().scalar(statement, *args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def get(self, entity, ident, *args, **kwargs):
+        result = await super().get(entity, ident, *args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+
+def fork_session(db: AsyncSession) -> AsyncSession:
+    """Open a session on the same engines as ``db``, for work that runs
+    concurrently with it. If ``db`` has written, the new session reads from
+    the primary too."""
+    if isinstance(db, LazySession):
+        session = LazySession(
+            bind=db.bind,
+            replica_bind=db.sync_session.replica_engine,
+            release_when_idle=db.release_when_idle,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+    else:
+        session = AsyncSession(bind=db.bind, expire_on_commit=False, autoflush=False)
+
+    if db.info.get(_WROTE):
+        session.info[_WROTE] = True
+    return session
+
+
+# Create async engines; without READ_REPLICA_URL every read hits the primary
+engine = build_engine()
+replica_engine = (
+    build_engine(url=settings.READ_REPLICA_URL) if settings.READ_REPLICA_URL else None
 )
 
 # Use async_sessionmaker
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
-    class_=AsyncSession,
+    class_=LazySession,
+    replica_bind=replica_engine,
+    release_when_idle=settings.DB_RELEASE_IDLE_CONNECTIONS,
     expire_on_commit=False,
     autoflush=False,
 )
@@ -36,3 +260,13 @@ async def create_tables():
     """Create all tables (for testing/development)"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+def get_pool_stats() -> dict:
+    """Connection pool usage for this worker"""
+    return engine.pool.stats()
+
+
+def get_replica_pool_stats() -> dict | None:
+    """Read replica connection pool usage for this worker, if one is configured"""
+    return replica_engine.pool.stats() if replica_engine else None
@@ -5,9 +5,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
+from app.core.cache import cache
 from app.core.config import settings
 from app.core.logging import LogfireMiddleware
+from app.core.security import password_hasher
 from app.db.session import create_tables, engine
+from app.services.token_service import warn_if_refresh_tokens_per_worker
 
 # Configure logfire
 if settings.LOGFIRE_TOKEN:
@@ -21,8 +24,19 @@ async def lifespan(app: FastAPI):
     # Startup - Initialize PostgreSQL database
     await create_tables()
     logfire.info("PostgreSQL database initialized successfully")
+    if settings.REDIS_URL:
+        try:
+            await cache.init_cache()
+            logfire.info("Redis cache initialized successfully")
+        except Exception as e:
+            # Run uncached rather than refusing to start
+            await cache.close()
+            logfire.error("Redis cache unavailable", error=str(e))
+    warn_if_refresh_tokens_per_worker()
     yield
     # Shutdown
+    await cache.close()
+    password_hasher.shutdown()
     await engine.dispose()
     logfire.info("Application shutdown complete")
 
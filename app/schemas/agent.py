@@ -3,7 +3,10 @@ from pydantic import BaseModel, Field
 
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=2000)
+    # Continue an earlier conversation; omit to start a new one
+    conversation_id: int | None = None
 
 
 class ChatResponse(BaseModel):
     response: str
+    conversation_id: int | None = None
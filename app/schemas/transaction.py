@@ -1,8 +1,10 @@
 from datetime import datetime
+from typing import List
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from app.db.models.transaction import TransactionStatus, TransactionType
+from app.utils.constants import MAX_BATCH_TRANSFERS
 
 
 class TransactionBase(BaseModel):
@@ -48,6 +50,14 @@ class TransactionQuery(BaseModel):
     end_date: datetime | None = None
     limit: int = 50
     offset: int = 0
+    cursor: str | None = None
+
+
+class TransactionPage(BaseModel):
+    """A page of transactions with the cursor for the next page"""
+
+    transactions: List[TransactionResponse]
+    next_cursor: str | None = None
 
 
 class TransferRequest(BaseModel):
@@ -65,6 +75,30 @@ class TransferRequest(BaseModel):
         return v
 
 
+class BatchTransferRequest(BaseModel):
+    """Request model for applying many transfers in one call"""
+
+    transfers: List[TransferRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_TRANSFERS
+    )
+
+
+class BatchTransferItem(BaseModel):
+    transfer_id: str
+    from_account: str
+    to_account: str
+    amount: float
+
+
+class BatchTransferResponse(BaseModel):
+    """Result of a batch transfer"""
+
+    message: str
+    count: int
+    total_amount: float
+    transfers: List[BatchTransferItem]
+
+
 class DepositRequest(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
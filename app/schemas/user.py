@@ -56,7 +56,19 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     email: EmailStr | None = None
+    # Claims embedded at login so requests can authenticate without a DB hit
+    user_id: int | None = None
+    full_name: str | None = None
+    is_active: bool | None = None
+    is_superuser: bool | None = None
+    roles: List[str] = []
+    generation: int | None = None
@@ -0,0 +1,129 @@
+"""Benchmark cache codecs against the previous stdlib JSON path.
+
+Usage:
+    python -m app.scripts.benchmark_cache_codec [--items 50] [--rounds 2000]
+
+The JSON baseline is what RedisCache used to do: ``model_dump`` to dicts,
+``json.dumps`` to text, then ``json.loads`` and ``model_validate`` on read.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from app.core.cache_codec import CODECS, CompressedCodec, msgpack
+from app.db.models.transaction import TransactionStatus, TransactionType
+from app.schemas.account import AccountResponse
+from app.schemas.transaction import TransactionResponse
+
+
+def sample_payloads(items: int) -> dict[str, tuple[type, list]]:
+    now = datetime.now(timezone.utc)
+    accounts = [
+        AccountResponse(
+            id=i,
+            user_id=1,
+            bank_id=1,
+            bank_name="First National Bank",
+            bank_code="FNB001",
+            account_number=f"ACC{i:012X}",
+            account_type="checking",
+            balance=1234.56 + i,
+            available_balance=1234.56 + i,
+            currency="USD",
+            status="active",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(items)
+    ]
+    transactions = [
+        TransactionResponse(
+            id=i,
+            account_id=1,
+            card_id=None,
+            amount=-42.5 - i,
+            transaction_type=TransactionType.PAYMENT,
+            merchant="Corner Coffee",
+            description="Card payment",
+            reference=f"TXN{i:012X}",
+            status=TransactionStatus.COMPLETED,
+            created_at=now,
+            updated_at=None,
+        )
+        for i in range(items)
+    ]
+    return {
+        "accounts": (list[AccountResponse], accounts),
+        "transactions": (list[TransactionResponse], transactions),
+    }
+
+
+def timed(fn: Callable[[], object], rounds: int) -> float:
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def run(items: int, rounds: int, compress_min_size: int) -> None:
+    codecs = {"stdlib json (baseline)": None}
+    for name, codec_class in CODECS.items():
+        if name == "msgpack" and msgpack is None:
+            continue
+        codecs[name] = CompressedCodec(codec_class(), 0)
+        codecs[f"{name} + zlib"] = CompressedCodec(codec_class(), compress_min_size)
+
+    for payload_name, (type_, values) in sample_payloads(items).items():
+        model = type_.__args__[0]
+        print(f"\n{payload_name} x {items}")
+        print(f"{'codec':<24}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+
+        for name, codec in codecs.items():
+            if codec is None:
+
+                def encode():
+                    return json.dumps(
+                        [value.model_dump(mode="json") for value in values]
+                    )
+
+                data = encode()
+
+                def decode():
+                    return [model.model_validate(item) for item in json.loads(data)]
+
+                size = len(data.encode())
+            else:
+
+                def encode():
+                    return codec.encode(values)
+
+                data = encode()
+
+                def decode():
+                    return codec.decode(data, type_)
+
+                size = len(data)
+
+            assert decode() == values
+            print(
+                f"{name:<24}{size:>10}"
+                f"{timed(encode, rounds):>12.1f}{timed(decode, rounds):>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50, help="Models per value")
+    parser.add_argument("--rounds", type=int, default=2000, help="Iterations each")
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=1024,
+        help="Compression threshold in bytes for the zlib variants",
+    )
+    args = parser.parse_args()
+    run(args.items, args.rounds, args.compress_min_size)
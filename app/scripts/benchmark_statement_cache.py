@@ -0,0 +1,161 @@
+"""Benchmark prepared statement and compiled query caching on hot queries.
+
+Usage:
+    python -m app.scripts.benchmark_statement_cache [--rounds 500]
+
+Seeds one user with an account and some transactions, times the hot service
+reads under each engine configuration, then deletes the seeded rows. Run it
+against a non-production database.
+
+- default: prepared statements and compiled SQL are reused
+- no prepared cache: every execution is parsed and planned again
+- no query cache: SQL is recompiled by SQLAlchemy on every execution
+- pgbouncer: the transaction-pooling mode (DB_PGBOUNCER=true)
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.models import card  # noqa: F401 - register every mapped model
+from app.db.models.account import Account, AccountType
+from app.db.models.bank import Bank
+from app.db.models.transaction import Transaction, TransactionType
+from app.db.models.transaction_rollup import TransactionRollup
+from app.db.models.user import User
+from app.db.session import build_engine
+from app.services.account_service import get_account_by_number
+from app.services.transaction_service import get_user_all_transactions
+from app.services.user_service import get_user_by_email
+
+MODES = {
+    "default": {},
+    "no prepared cache": {"DB_PREPARED_STATEMENT_CACHE_SIZE": 0},
+    "no query cache": {"DB_QUERY_CACHE_SIZE": 0},
+    "pgbouncer": {"DB_PGBOUNCER": True},
+}
+
+
+async def seed(session: AsyncSession, transactions: int) -> dict:
+    tag = uuid.uuid4().hex[:10]
+    bank = Bank(name=f"Benchmark Bank {tag}", code=f"BM{tag}", country="US")
+    user = User(
+        email=f"benchmark_{tag}@example.com",
+        hashed_pwd="!",
+        full_name="Benchmark User",
+    )
+    session.add_all([bank, user])
+    await session.flush()
+
+    account = Account(
+        user_id=user.id,
+        bank_id=bank.id,
+        account_number=f"BM{tag}",
+        account_type=AccountType.CHECKING,
+    )
+    session.add(account)
+    await session.flush()
+
+    await session.execute(
+        insert(Transaction),
+        [
+            {
+                "account_id": account.id,
+                "amount": 10.0 + i,
+                "transaction_type": TransactionType.DEPOSIT,
+                "reference": f"BM{tag}{i:06d}",
+            }
+            for i in range(transactions)
+        ],
+    )
+    await session.commit()
+    return {
+        "bank_id": bank.id,
+        "user_id": user.id,
+        "email": user.email,
+        "account_id": account.id,
+        "account_number": account.account_number,
+    }
+
+
+async def cleanup(session: AsyncSession, seeded: dict) -> None:
+    account_id = seeded["account_id"]
+    await session.execute(
+        delete(Transaction).filter(Transaction.account_id == account_id)
+    )
+    await session.execute(
+        delete(TransactionRollup).filter(TransactionRollup.account_id == account_id)
+    )
+    await session.execute(delete(Account).filter(Account.id == account_id))
+    await session.execute(delete(User).filter(User.id == seeded["user_id"]))
+    await session.execute(delete(Bank).filter(Bank.id == seeded["bank_id"]))
+    await session.commit()
+
+
+async def time_mode(overrides: dict, seeded: dict, rounds: int) -> dict[str, float]:
+    engine = build_engine(settings.model_copy(update=overrides))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    queries = {
+        "get_account_by_number": lambda db: get_account_by_number(
+            db, seeded["account_number"]
+        ),
+        "get_user_by_email": lambda db: get_user_by_email(db, seeded["email"]),
+        "get_user_all_transactions": lambda db: get_user_all_transactions(
+            db, seeded["user_id"], limit=50
+        ),
+    }
+
+    results = {}
+    try:
+        async with session_factory() as db:
+            for name, query in queries.items():
+                for _ in range(20):  # warm up connection and caches
+                    await query(db)
+                    db.expunge_all()
+
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    await query(db)
+                    db.expunge_all()
+                results[name] = (time.perf_counter() - started) / rounds * 1e6
+    finally:
+        await engine.dispose()
+    return results
+
+
+async def main(rounds: int, transactions: int) -> None:
+    engine = build_engine()
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        seeded = await seed(session, transactions)
+
+    try:
+        timings = {
+            mode: await time_mode(overrides, seeded, rounds)
+            for mode, overrides in MODES.items()
+        }
+    finally:
+        async with session_factory() as session:
+            await cleanup(session, seeded)
+        await engine.dispose()
+
+    queries = list(timings["default"])
+    print(f"Mean latency per call in microseconds ({rounds} rounds)\n")
+    print(f"{'mode':<20}" + "".join(f"{query:>28}" for query in queries))
+    for mode, results in timings.items():
+        print(f"{mode:<20}" + "".join(f"{results[query]:>28.1f}" for query in queries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500, help="Calls per query")
+    parser.add_argument(
+        "--transactions", type=int, default=500, help="Transactions to seed"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.transactions))
@@ -0,0 +1,84 @@
+"""Load test: does a login burst slow down unrelated endpoints?
+
+Usage:
+    python -m app.scripts.load_test_auth [--base-url http://localhost:8000]
+        [--logins 50] [--probes 200]
+
+Against a running server, this measures ``/health`` latency on its own and
+then again while ``--logins`` concurrent ``/auth/token`` requests are in
+flight. With bcrypt on the event loop the second run degrades by roughly
+one hash per queued login. With the password hash pool it should stay
+close to the baseline.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+PASSWORD = "loadtest-password"
+
+
+async def probe_latencies(client: httpx.AsyncClient, probes: int) -> list[float]:
+    latencies = []
+    for _ in range(probes):
+        started = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def login(client: httpx.AsyncClient, email: str) -> int:
+    response = await client.post(
+        "/api/v1/auth/token", data={"username": email, "password": PASSWORD}
+    )
+    return response.status_code
+
+
+def summarize(label: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<22} p50={quantiles[49]:7.1f}ms  p95={quantiles[94]:7.1f}ms  "
+        f"max={max(latencies):7.1f}ms"
+    )
+
+
+async def main(base_url: str, logins: int, probes: int) -> None:
+    limits = httpx.Limits(max_connections=logins + 10)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=120, limits=limits
+    ) as client:
+        email = f"loadtest_{uuid.uuid4().hex[:8]}@example.com"
+        response = await client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "password": PASSWORD, "full_name": "Load Test"},
+        )
+        response.raise_for_status()
+
+        summarize("/health (idle)", await probe_latencies(client, probes))
+
+        started = time.perf_counter()
+        burst = asyncio.gather(*(login(client, email) for _ in range(logins)))
+        latencies = await probe_latencies(client, probes)
+        statuses = await burst
+        elapsed = time.perf_counter() - started
+
+        summarize("/health (login burst)", latencies)
+        print(
+            f"{logins} logins in {elapsed:.1f}s: "
+            f"{statuses.count(200)} ok, {statuses.count(503)} shed (503)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.logins, args.probes))
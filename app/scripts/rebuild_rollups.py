@@ -0,0 +1,35 @@
+"""Backfill transaction rollups from the existing ledger.
+
+Usage:
+    python -m app.scripts.rebuild_rollups [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+
+import logfire
+
+# Register every mapped model so relationships resolve outside the app
+from app.db.models import bank, card, user  # noqa: F401
+from app.db.session import AsyncSessionLocal, engine
+from app.services.rollup_service import rebuild_transaction_rollups
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        accounts = await rebuild_transaction_rollups(session, batch_size)
+    await engine.dispose()
+    logfire.info("Transaction rollups rebuilt", accounts=accounts)
+    print(f"Rebuilt transaction rollups for {accounts} accounts")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Number of accounts to rebuild per transaction",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -1,4 +1,5 @@
 import uuid
+from typing import Iterable
 
 import logfire
 from fastapi import HTTPException, status
@@ -6,10 +7,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import cache
 from app.db.models.account import Account, AccountStatus
 from app.db.models.bank import Bank
 from app.db.models.user import User
-from app.schemas.account import AccountCreate, AccountUpdate
+from app.db.session import use_primary
+from app.schemas.account import AccountCreate, AccountResponse, AccountUpdate
 
 
 async def generate_account_number() -> str:
@@ -49,6 +52,7 @@ async def create_account(
         db.add(account)
         await db.commit()
         await db.refresh(account)
+        await invalidate_account_cache([account])
 
         # IMPORTANT: Use the same session to reload with relationships
         result = await db.execute(
@@ -96,6 +100,72 @@ async def get_account_by_number(
         return result.scalar_one_or_none()
 
 
+# ------------------------
+# ⚡ Read-through Cache
+# ------------------------
+
+
+def user_cache_namespace(user_id: int) -> str:
+    """Namespace holding every cached read that belongs to one user"""
+    return f"user:{user_id}"
+
+
+def account_cache_namespace(account_number: str) -> str:
+    """Namespace holding the cached reads of one account"""
+    return f"account:{account_number}"
+
+
+async def get_cached_user_accounts(
+    db: AsyncSession, user_id: int
+) -> list[AccountResponse]:
+    """Get all accounts for a user, served from cache when possible"""
+
+    async def load() -> list[AccountResponse]:
+        with use_primary(db):
+            accounts = await get_all_accounts(db, user_id)
+        return [AccountResponse.model_validate(account) for account in accounts]
+
+    return await cache.get_or_load(
+        "accounts",
+        load,
+        type_=list[AccountResponse],
+        namespace=user_cache_namespace(user_id),
+        early_refresh=True,
+    )
+
+
+async def get_cached_account_by_number(
+    db: AsyncSession, account_number: str
+) -> AccountResponse | None:
+    """Get an account by number, served from cache when possible"""
+
+    async def load() -> AccountResponse | None:
+        with use_primary(db):
+            account = await get_account_by_number(db, account_number)
+        return AccountResponse.model_validate(account) if account else None
+
+    return await cache.get_or_load(
+        "details",
+        load,
+        type_=AccountResponse,
+        namespace=account_cache_namespace(account_number),
+        early_refresh=True,
+    )
+
+
+async def invalidate_account_cache(accounts: Iterable[Account]) -> None:
+    """Drop cached reads for accounts after their balance or details change.
+
+    Moving the namespaces to a new generation, rather than deleting keys,
+    also retires a load that started before the change and finishes after.
+    """
+    accounts = list(accounts)
+    await cache.invalidate_namespace(
+        *{account_cache_namespace(account.account_number) for account in accounts},
+        *{user_cache_namespace(account.user_id) for account in accounts},
+    )
+
+
 async def update_account_balance(
     db: AsyncSession, account_id: int, amount: float
 ) -> Account:
@@ -120,6 +190,7 @@ async def update_account_balance(
 
         await db.commit()
         await db.refresh(account)
+        await invalidate_account_cache([account])
         return account
 
 
@@ -160,6 +231,7 @@ async def update_account(
 
         await db.commit()
         await db.refresh(account)
+        await invalidate_account_cache([account])
         return account
 
 
@@ -189,4 +261,5 @@ async def delete_account(
 
         await db.delete(account)
         await db.commit()
+        await invalidate_account_cache([account])
         return True
@@ -3,8 +3,13 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache
 from app.db.models.bank import Bank
-from app.schemas.bank import BankCreate, BankUpdate
+from app.db.session import use_primary
+from app.schemas.bank import BankCreate, BankResponse, BankUpdate
+from app.services.response_cache import agent_response_cache
+
+ACTIVE_BANKS_CACHE_KEY = "banks:active"
 
 
 async def get_bank_by_id(db: AsyncSession, bank_id: int) -> Bank:
@@ -29,6 +34,23 @@ async def get_all_active_banks(db: AsyncSession) -> list[Bank]:
         return banks
 
 
+async def get_cached_active_banks(db: AsyncSession) -> list[BankResponse]:
+    """Get all active banks, served from the in-process or Redis cache"""
+
+    async def load() -> list[BankResponse]:
+        with use_primary(db):
+            banks = await get_all_active_banks(db)
+        return [BankResponse.model_validate(bank) for bank in banks]
+
+    return await cache.get_or_load(
+        ACTIVE_BANKS_CACHE_KEY,
+        load,
+        type_=list[BankResponse],
+        local=True,
+        early_refresh=True,
+    )
+
+
 async def get_banks_by_country(db: AsyncSession, country: str) -> list[Bank]:
     """Get banks by country"""
     with logfire.span("get_banks_by_country", country=country):
@@ -55,6 +77,8 @@ async def create_bank(db: AsyncSession, bank_data: BankCreate) -> Bank:
         db.add(bank)
         await db.commit()
         await db.refresh(bank)
+        await cache.delete(ACTIVE_BANKS_CACHE_KEY)
+        await agent_response_cache.invalidate()
         return bank
 
 
@@ -72,6 +96,8 @@ async def update_bank(db: AsyncSession, bank_id: int, bank_data: BankUpdate) ->
 
         await db.commit()
         await db.refresh(bank)
+        await cache.delete(ACTIVE_BANKS_CACHE_KEY)
+        await agent_response_cache.invalidate()
         return bank
 
 
@@ -86,4 +112,6 @@ async def delete_bank(db: AsyncSession, bank_id: int) -> bool:
 
         await db.delete(bank)
         await db.commit()
+        await cache.delete(ACTIVE_BANKS_CACHE_KEY)
+        await agent_response_cache.invalidate()
         return True
@@ -10,7 +10,9 @@ from app.db.models.account import Account
 from app.db.models.bank import Bank
 from app.db.models.card import Card, CardStatus
 from app.db.models.transaction import Transaction
+from app.db.session import replica_read
 from app.schemas.card import CardCreate, CardUpdate
+from app.services.transaction_service import paginate_transactions
 
 # ------------------------
 # 🔧 Utility Functions
@@ -72,6 +74,7 @@ async def get_card_by_number(db: AsyncSession, card_number: str) -> Card:
         return card
 
 
+@replica_read
 async def get_user_cards(db: AsyncSession, user_id: int) -> list[Card]:
     """Get all cards for a user"""
     with logfire.span("get_user_cards", user_id=user_id):
@@ -265,7 +268,11 @@ async def delete_card(db: AsyncSession, card_id: int, user_id: int) -> bool:
 
 
 async def get_card_transactions(
-    db: AsyncSession, card_id: int, user_id: int, limit: int = 10
+    db: AsyncSession,
+    card_id: int,
+    user_id: int,
+    limit: int = 10,
+    cursor: str | None = None,
 ) -> list:
     """Get recent transactions for a specific card"""
     with logfire.span("get_card_transactions", card_id=card_id, limit=limit):
@@ -279,12 +286,8 @@ async def get_card_transactions(
         await _verify_card_ownership(db, card, user_id)
 
         # Direct database query for card transactions
-        result = await db.execute(
-            select(Transaction)
-            .filter(Transaction.card_id == card_id)
-            .order_by(Transaction.created_at.desc())
-            .limit(limit)
-        )
+        stmt = select(Transaction).filter(Transaction.card_id == card_id)
+        result = await db.execute(paginate_transactions(stmt, limit, cursor))
         return result.scalars().all()
 
 
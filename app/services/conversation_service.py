@@ -0,0 +1,197 @@
+import dataclasses
+import json
+from typing import Sequence
+
+import logfire
+from fastapi import HTTPException, status
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    SystemPromptPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.conversation import Conversation
+
+# ------------------------
+# ✂️ History Trimming
+# ------------------------
+#
+# History is replayed with every message, so its size is paid for in latency
+# and cost on every turn. It is trimmed before it is stored: instructions are
+# dropped (the agent sends them on every run), tool outputs of earlier turns
+# are truncated, then whole turns are evicted oldest first and folded into a
+# short summary of what the user asked. The latest turn is always kept whole.
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_HEADER = "Earlier in this conversation the user asked:"
+SUMMARY_MAX_QUESTIONS = 10
+SUMMARY_QUESTION_CHARS = 200
+
+
+def _part_text(part) -> str:
+    if isinstance(part, ToolReturnPart):
+        return part.model_response_str()
+    if isinstance(part, ToolCallPart):
+        return part.tool_name + part.args_as_json_str()
+    content = getattr(part, "content", "")
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+def estimate_tokens(messages: Sequence[ModelMessage]) -> int:
+    """Rough prompt token count of messages, without a tokenizer"""
+    chars = sum(len(_part_text(part)) for message in messages for part in message.parts)
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def _split_turns(messages: Sequence[ModelMessage]) -> list[list[ModelMessage]]:
+    """Group messages into turns, each starting at a user prompt"""
+    turns = []
+    for message in messages:
+        starts_turn = isinstance(message, ModelRequest) and any(
+            isinstance(part, UserPromptPart) for part in message.parts
+        )
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _without_instructions(message: ModelMessage) -> ModelMessage:
+    if isinstance(message, ModelRequest) and message.instructions:
+        return dataclasses.replace(message, instructions=None)
+    return message
+
+
+def _shrink_tool_outputs(turn: list[ModelMessage], max_chars: int) -> list:
+    shrunk = []
+    for message in turn:
+        if isinstance(message, ModelRequest):
+            parts = []
+            for part in message.parts:
+                if isinstance(part, ToolReturnPart):
+                    content = part.model_response_str()
+                    if len(content) > max_chars:
+                        part = dataclasses.replace(
+                            part, content=content[:max_chars] + "… [truncated]"
+                        )
+                parts.append(part)
+            message = dataclasses.replace(message, parts=parts)
+        shrunk.append(message)
+    return shrunk
+
+
+def _summary_questions(turn: list[ModelMessage]) -> list[str]:
+    """Questions from an earlier summary in the turn, then the turn's own"""
+    questions = []
+    for part in turn[0].parts if isinstance(turn[0], ModelRequest) else []:
+        if isinstance(part, SystemPromptPart) and part.content.startswith(
+            SUMMARY_HEADER
+        ):
+            questions.extend(line[2:] for line in part.content.splitlines()[1:] if line)
+        elif isinstance(part, UserPromptPart):
+            content = part.content
+            if not isinstance(content, str):
+                content = json.dumps(content, default=str)
+            questions.append(content[:SUMMARY_QUESTION_CHARS])
+    return questions
+
+
+def _with_summary(turn: list[ModelMessage], questions: list[str]) -> list:
+    lines = [f"- {question}" for question in questions[-SUMMARY_MAX_QUESTIONS:]]
+    summary = SystemPromptPart(content="\n".join([SUMMARY_HEADER, *lines]))
+    first, *rest = turn
+    parts = [
+        part
+        for part in first.parts
+        if not (
+            isinstance(part, SystemPromptPart)
+            and part.content.startswith(SUMMARY_HEADER)
+        )
+    ]
+    return [dataclasses.replace(first, parts=[summary, *parts]), *rest]
+
+
+def trim_history(
+    messages: Sequence[ModelMessage],
+    max_tokens: int,
+    tool_output_chars: int,
+) -> list[ModelMessage]:
+    """Fit a conversation into roughly ``max_tokens``"""
+    turns = _split_turns([_without_instructions(message) for message in messages])
+    if not turns:
+        return []
+
+    turns = [
+        *(_shrink_tool_outputs(turn, tool_output_chars) for turn in turns[:-1]),
+        turns[-1],
+    ]
+
+    evicted = []
+    while len(turns) > 1 and estimate_tokens(sum(turns, [])) > max_tokens:
+        evicted.extend(_summary_questions(turns.pop(0)))
+
+    if evicted:
+        turns[0] = _with_summary(turns[0], evicted)
+    return sum(turns, [])
+
+
+# ------------------------
+# 💬 Conversation Persistence
+# ------------------------
+
+
+async def get_conversation(
+    db: AsyncSession, conversation_id: int, user_id: int
+) -> Conversation:
+    """Get one of the user's conversations"""
+    with logfire.span("get_conversation", conversation_id=conversation_id):
+        conversation = await db.get(Conversation, conversation_id)
+        if not conversation or conversation.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found",
+            )
+        return conversation
+
+
+def load_history(conversation: Conversation | None) -> list[ModelMessage]:
+    """Messages to replay as the agent's message_history"""
+    if conversation is None or not conversation.messages:
+        return []
+    return ModelMessagesTypeAdapter.validate_python(conversation.messages)
+
+
+async def save_history(
+    db: AsyncSession,
+    user_id: int,
+    conversation: Conversation | None,
+    messages: Sequence[ModelMessage],
+) -> Conversation:
+    """Store the trimmed history, starting a conversation if there is none"""
+    trimmed = trim_history(
+        messages,
+        settings.AGENT_HISTORY_MAX_TOKENS,
+        settings.AGENT_HISTORY_TOOL_OUTPUT_CHARS,
+    )
+    with logfire.span(
+        "save_conversation_history",
+        user_id=user_id,
+        messages=len(trimmed),
+        estimated_tokens=estimate_tokens(trimmed),
+    ):
+        if conversation is None:
+            conversation = Conversation(user_id=user_id)
+            db.add(conversation)
+
+        conversation.messages = ModelMessagesTypeAdapter.dump_python(
+            trimmed, mode="json"
+        )
+        await db.commit()
+        return conversation
@@ -1,18 +1,39 @@
-from typing import Annotated, List, Optional
+import dataclasses
+import functools
+import time
+from datetime import date
+from typing import Annotated, Any, AsyncIterator, List, Optional
 
 import logfire
-from pydantic import BaseModel, ConfigDict
-from pydantic_ai import Agent, RunContext
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_ai import Agent, AgentRunResultEvent, RunContext
+from pydantic_ai.messages import (
+    FunctionToolCallEvent,
+    FunctionToolResultEvent,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPart,
+    TextPartDelta,
+    ToolCallPart,
+    UserPromptPart,
+)
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.deepseek import DeepSeekProvider
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.db.models.conversation import Conversation
+from app.db.session import fork_session, use_replica
 from app.schemas.account import AccountResponse
+from app.schemas.agent import ChatResponse
 from app.schemas.bank import BankResponse
 from app.schemas.card import CardResponse
 from app.schemas.transaction import (
     DepositRequest,
+    TransactionPage,
     TransactionQuery,
     TransactionResponse,
     TransferRequest,
@@ -22,19 +43,24 @@ from app.schemas.user import UserResponse
 from app.services.account_service import (
     get_account_by_id,
     get_account_by_number,
-    get_all_accounts,
+    get_cached_account_by_number,
+    get_cached_user_accounts,
 )
-from app.services.bank_service import get_all_active_banks
+from app.services.bank_service import get_cached_active_banks
 from app.services.card_service import get_user_cards
+from app.services.conversation_service import load_history, save_history
+from app.services.response_cache import agent_response_cache
 from app.services.transaction_service import (
     deposit_funds,
     get_transaction_by_reference,
+    get_transaction_summary,
     get_transactions,
     get_user_all_transactions,
     transfer_funds,
     withdraw_funds,
 )
 from app.services.user_service import get_user_by_id
+from app.utils.helpers import format_sse, next_cursor
 
 # ------------------------
 # 🏦 Pydantic Models for Agent State
@@ -48,6 +74,8 @@ class AgentDependencies(BaseModel):
 
     db: AsyncSession
     user_id: int
+    # Read-only tool results of this run, keyed by tool name and arguments
+    tool_results: dict[tuple, Any] = Field(default_factory=dict)
 
 
 # ------------------------
@@ -63,14 +91,16 @@ _banking_model = OpenAIChatModel(
 # Define the banking agent with all tools
 banking_agent = Agent(
     model=_banking_model,
-    system_prompt="""
+    # Instructions, unlike system prompts, are sent on every run and are not
+    # part of the stored conversation history
+    instructions="""
     You are a helpful bank support assistant with REAL-TIME access to customer data. 
     You can access actual account information, transactions, and user profiles.
 
     CAPABILITIES:
     - View all user accounts and balances
     - Check specific account details
-    - View recent transaction history
+    - View recent transaction history (page through older history with next_cursor)
     - View user's payment cards (masked for security)
     - Access user profile information
     - Transfer funds between accounts
@@ -78,6 +108,7 @@ banking_agent = Agent(
     - Look up transactions by reference
     - Get bank information
     - Get transactions for specific accounts
+    - Summarize income and spending for an account over a date range
 
     SECURITY & GUIDELINES:
     - Only access data for the authenticated user
@@ -100,28 +131,91 @@ banking_agent = Agent(
 # ------------------------
 
 
+_tool_memo_hits = logfire.metric_counter(
+    "agent.tool.memo_hits",
+    description="Read-only tool calls answered from earlier results in the run",
+)
+
+
+def _memo_key(tool, args: tuple, kwargs: dict) -> tuple | None:
+    key = (tool.__name__, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def read_only_tool(tool):
+    """Mark a tool that never writes.
+
+    The model may call several tools in one turn and they run concurrently,
+    but one AsyncSession cannot run concurrent queries. Read-only tools
+    therefore get their own session (reading from the replica when there
+    is one), while writing tools are registered with ``sequential=True``
+    and run alone on the request session.
+
+    A repeated call with the same arguments returns the result from earlier
+    in the run until a mutating tool runs.
+    """
+
+    @functools.wraps(tool)
+    async def wrapper(ctx: RunContext[AgentDependencies], *args, **kwargs):
+        key = _memo_key(tool, args, kwargs)
+        if key in ctx.deps.tool_results:
+            _tool_memo_hits.add(1, {"tool": tool.__name__})
+            return ctx.deps.tool_results[key]
+
+        async with fork_session(ctx.deps.db) as db:
+            with use_replica(db):
+                deps = ctx.deps.model_copy(update={"db": db})
+                result = await tool(
+                    dataclasses.replace(ctx, deps=deps), *args, **kwargs
+                )
+
+        if key is not None:
+            ctx.deps.tool_results[key] = result
+        return result
+
+    return wrapper
+
+
+def mutating_tool(tool):
+    """Mark a tool that writes; read-only results memoized so far are dropped"""
+
+    @functools.wraps(tool)
+    async def wrapper(ctx: RunContext[AgentDependencies], *args, **kwargs):
+        try:
+            return await tool(ctx, *args, **kwargs)
+        finally:
+            ctx.deps.tool_results.clear()
+
+    return wrapper
+
+
 @banking_agent.tool
+@read_only_tool
 async def get_user_accounts(
     ctx: RunContext[AgentDependencies],
 ) -> List[AccountResponse]:
     """Get all accounts for the current user with balances and details."""
     try:
-        accounts = await get_all_accounts(ctx.deps.db, ctx.deps.user_id)
-        return [AccountResponse.model_validate(account) for account in accounts]
+        return await get_cached_user_accounts(ctx.deps.db, ctx.deps.user_id)
     except Exception as e:
         logfire.error("Error getting user accounts", error=str(e))
         return []
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_account_balance_details(
     ctx: RunContext[AgentDependencies], account_number: str
 ) -> Optional[AccountResponse]:
     """Get specific account details and balance by account number."""
     try:
-        account = await get_account_by_number(ctx.deps.db, account_number)
+        account = await get_cached_account_by_number(ctx.deps.db, account_number)
         if account and account.user_id == ctx.deps.user_id:
-            return AccountResponse.model_validate(account)
+            return account
         return None
     except Exception as e:
         logfire.error("Error getting account balance", error=str(e))
@@ -129,6 +223,7 @@ async def get_account_balance_details(
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_user_payment_cards(
     ctx: RunContext[AgentDependencies],
 ) -> List[CardResponse]:
@@ -142,6 +237,7 @@ async def get_user_payment_cards(
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_user_profile(
     ctx: RunContext[AgentDependencies],
 ) -> Optional[UserResponse]:
@@ -157,6 +253,7 @@ async def get_user_profile(
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_account_detail_by_id(
     ctx: RunContext[AgentDependencies], account_id: int
 ) -> Optional[AccountResponse]:
@@ -172,64 +269,96 @@ async def get_account_detail_by_id(
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_banks(ctx: RunContext[AgentDependencies]) -> List[BankResponse]:
     """Get list of all active banks in the system."""
     try:
-        banks = await get_all_active_banks(ctx.deps.db)
-        return [BankResponse.model_validate(bank) for bank in banks]
+        return await get_cached_active_banks(ctx.deps.db)
     except Exception as e:
         logfire.error("Error getting banks", error=str(e))
         return []
 
 
+def _transaction_page(transactions, limit: int) -> TransactionPage:
+    """Wrap a list of transactions with the cursor for the following page"""
+    return TransactionPage(
+        transactions=[TransactionResponse.model_validate(tx) for tx in transactions],
+        next_cursor=next_cursor(transactions, limit),
+    )
+
+
 @banking_agent.tool
+@read_only_tool
 async def get_user_transactions_across_accounts(
     ctx: RunContext[AgentDependencies],
     limit: Annotated[int, "Number of transactions to return"] = 10,
-) -> List[TransactionResponse]:
-    """Get transactions for the user across all accounts."""
+    cursor: Annotated[str | None, "next_cursor from a previous page"] = None,
+) -> TransactionPage:
+    """Get transactions for the user across all accounts, newest first."""
     try:
         if limit > 50:
             limit = 50
 
-        # Use the renamed function
         transactions = await get_user_all_transactions(
-            ctx.deps.db, ctx.deps.user_id, limit
+            ctx.deps.db, ctx.deps.user_id, limit, cursor
         )
-        return [TransactionResponse.model_validate(tx) for tx in transactions]
+        return _transaction_page(transactions, limit)
     except Exception as e:
         logfire.error("Error getting user transactions", error=str(e), stack_trace=True)
-        return []
+        return TransactionPage(transactions=[])
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_account_transactions(
     ctx: RunContext[AgentDependencies],
     account_number: str,
     limit: Annotated[int, "Number of transactions to return"] = 10,
-) -> List[TransactionResponse]:
-    """Get recent transactions for a specific account."""
+    cursor: Annotated[str | None, "next_cursor from a previous page"] = None,
+) -> TransactionPage:
+    """Get recent transactions for a specific account, newest first."""
     try:
         if limit > 50:
             limit = 50
 
         account = await get_account_by_number(ctx.deps.db, account_number)
         if not account or account.user_id != ctx.deps.user_id:
-            return []
+            return TransactionPage(transactions=[])
 
-        # Use the correct get_transactions function with TransactionQuery
-        query = TransactionQuery(account_id=account.id, limit=limit)
+        query = TransactionQuery(account_id=account.id, limit=limit, cursor=cursor)
         transactions = await get_transactions(ctx.deps.db, query)
-
-        return [TransactionResponse.model_validate(tx) for tx in transactions]
+        return _transaction_page(transactions, limit)
     except Exception as e:
         logfire.error(
             "Error getting account transactions", error=str(e), stack_trace=True
         )
-        return []
+        return TransactionPage(transactions=[])
 
 
 @banking_agent.tool
+@read_only_tool
+async def get_account_spending_summary(
+    ctx: RunContext[AgentDependencies],
+    account_number: str,
+    start_date: Annotated[date | None, "First day to include"] = None,
+    end_date: Annotated[date | None, "Last day to include"] = None,
+) -> Optional[dict]:
+    """Get deposit, withdrawal, transfer and payment totals for an account."""
+    try:
+        account = await get_account_by_number(ctx.deps.db, account_number)
+        if not account or account.user_id != ctx.deps.user_id:
+            return None
+
+        return await get_transaction_summary(
+            ctx.deps.db, account.id, start_date, end_date
+        )
+    except Exception as e:
+        logfire.error("Error getting spending summary", error=str(e))
+        return None
+
+
+@banking_agent.tool(sequential=True)
+@mutating_tool
 async def transfer_funds_between_accounts(
     ctx: RunContext[AgentDependencies], request: TransferRequest
 ) -> dict:
@@ -258,7 +387,8 @@ async def transfer_funds_between_accounts(
         return {"error": str(e), "success": False}
 
 
-@banking_agent.tool
+@banking_agent.tool(sequential=True)
+@mutating_tool
 async def deposit_funds_into_accounts(
     ctx: RunContext[AgentDependencies], request: DepositRequest
 ) -> dict:
@@ -285,7 +415,8 @@ async def deposit_funds_into_accounts(
         return {"error": str(e), "success": False}
 
 
-@banking_agent.tool
+@banking_agent.tool(sequential=True)
+@mutating_tool
 async def withdraw_funds_an_account(
     ctx: RunContext[AgentDependencies], request: WithdrawalRequest
 ) -> dict:
@@ -313,6 +444,7 @@ async def withdraw_funds_an_account(
 
 
 @banking_agent.tool
+@read_only_tool
 async def get_transaction_details_by_reference(
     ctx: RunContext[AgentDependencies], reference: str
 ) -> Optional[TransactionResponse]:
@@ -333,28 +465,93 @@ async def get_transaction_details_by_reference(
 # 🚀 Agent Functions
 # ------------------------
 
+# Tools whose results are the same for every user. An answer that used no
+# other tool can be reused for anyone asking a similar question.
+USER_INDEPENDENT_TOOLS = frozenset({"get_banks"})
+
+
+def _uses_only_shared_tools(messages: list[ModelMessage]) -> bool:
+    return all(
+        part.tool_name in USER_INDEPENDENT_TOOLS
+        for message in messages
+        if isinstance(message, ModelResponse)
+        for part in message.parts
+        if isinstance(part, ToolCallPart)
+    )
+
+
+async def _cached_answer(user_query: str, conversation: Conversation | None):
+    """Answer from the response cache; only fresh conversations are eligible"""
+    if conversation is not None or not settings.AGENT_RESPONSE_CACHE_ENABLED:
+        return None
+    return await agent_response_cache.lookup(user_query)
+
+
+async def _remember_answer(user_query: str, is_new: bool, result) -> None:
+    if (
+        is_new
+        and settings.AGENT_RESPONSE_CACHE_ENABLED
+        and _uses_only_shared_tools(result.new_messages())
+    ):
+        await agent_response_cache.store(user_query, str(result.output))
+
+
+def _cached_exchange(user_query: str, answer: str) -> list[ModelMessage]:
+    """History for a turn answered from the cache, so it can be followed up"""
+    return [
+        ModelRequest(parts=[UserPromptPart(user_query)]),
+        ModelResponse(parts=[TextPart(answer)]),
+    ]
+
+
+_time_to_first_byte = logfire.metric_histogram(
+    "agent.chat.time_to_first_byte",
+    unit="ms",
+    description="Time from receiving a chat message to sending the first byte back",
+)
+
 
 async def chat_with_agent_enhanced(
-    user_query: str, db: AsyncSession, user_id: int
-) -> str:
+    user_query: str,
+    db: AsyncSession,
+    user_id: int,
+    conversation: Conversation | None = None,
+) -> ChatResponse:
     """Enhanced function to chat with banking agent using real data"""
     with logfire.span("enhanced_agent_chat", user_query=user_query, user_id=user_id):
         try:
             logfire.info("Calling enhanced banking agent...")
 
+            # Repeated user-independent questions skip the model entirely
+            cached = await _cached_answer(user_query, conversation)
+            if cached is not None:
+                conversation = await save_history(
+                    db, user_id, conversation, _cached_exchange(user_query, cached)
+                )
+                return ChatResponse(response=cached, conversation_id=conversation.id)
+
             # Create dependencies
             deps = AgentDependencies(db=db, user_id=user_id)
 
-            # Run the agent with dependencies
-            result = await banking_agent.run(user_query, deps=deps)
+            # Run the agent with dependencies and the conversation so far
+            started = time.perf_counter()
+            result = await banking_agent.run(
+                user_query, deps=deps, message_history=load_history(conversation)
+            )
+            _time_to_first_byte.record(
+                (time.perf_counter() - started) * 1000, {"streaming": False}
+            )
+            await _remember_answer(user_query, conversation is None, result)
+            conversation = await save_history(
+                db, user_id, conversation, result.all_messages()
+            )
 
-            # Simple approach - just return the string representation
-            response_text = str(result)
+            response_text = str(result.output)
 
             logfire.info(
                 "Enhanced agent response successful", response_length=len(response_text)
             )
-            return response_text
+            return ChatResponse(response=response_text, conversation_id=conversation.id)
 
         except Exception as e:
             logfire.error(
@@ -363,4 +560,111 @@ async def chat_with_agent_enhanced(
                 error_type=type(e).__name__,
                 stack_trace=True,
             )
-            return f"I apologize, but I'm having trouble processing your request. Error: {str(e)}"
+            return ChatResponse(
+                response=f"I apologize, but I'm having trouble processing your request. Error: {str(e)}",
+                conversation_id=conversation.id if conversation else None,
+            )
+
+
+def _sse_for_event(event) -> str | None:
+    """Translate an agent stream event into an SSE message, if it is one we send"""
+    if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+        if event.part.content:
+            return format_sse("token", {"delta": event.part.content})
+    elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+        if event.delta.content_delta:
+            return format_sse("token", {"delta": event.delta.content_delta})
+    elif isinstance(event, FunctionToolCallEvent):
+        return format_sse("tool_call", {"tool": event.part.tool_name})
+    elif isinstance(event, FunctionToolResultEvent):
+        return format_sse("tool_result", {"tool": event.part.tool_name})
+    return None
+
+
+async def _agent_event_stream(
+    user_query: str,
+    db: AsyncSession,
+    user_id: int,
+    conversation: Conversation | None,
+) -> AsyncIterator[str]:
+    """SSE messages for one agent run.
+
+    Uses ``run_stream_events`` rather than ``run_stream``: ``run_stream`` only
+    exposes the output once the model starts producing it, so tool calls never
+    reach the client, and it ends the run at the first text output without
+    executing tool calls made in the same response.
+    """
+    try:
+        cached = await _cached_answer(user_query, conversation)
+        if cached is not None:
+            conversation = await save_history(
+                db, user_id, conversation, _cached_exchange(user_query, cached)
+            )
+            yield format_sse("token", {"delta": cached})
+            yield format_sse(
+                "done", {"response": cached, "conversation_id": conversation.id}
+            )
+            return
+
+        deps = AgentDependencies(db=db, user_id=user_id)
+        async with banking_agent.run_stream_events(
+            user_query, deps=deps, message_history=load_history(conversation)
+        ) as events:
+            async for event in events:
+                if isinstance(event, AgentRunResultEvent):
+                    await _remember_answer(
+                        user_query, conversation is None, event.result
+                    )
+                    conversation = await save_history(
+                        db, user_id, conversation, event.result.all_messages()
+                    )
+                    yield format_sse(
+                        "done",
+                        {
+                            "response": str(event.result.output),
+                            "conversation_id": conversation.id,
+                        },
+                    )
+                elif message := _sse_for_event(event):
+                    yield message
+    except Exception as e:
+        logfire.error(
+            "Streamed agent chat error",
+            error=str(e),
+            error_type=type(e).__name__,
+            stack_trace=True,
+        )
+        yield format_sse(
+            "error",
+            {"detail": "Unable to process your request at this time."},
+        )
+
+
+async def stream_chat_with_agent(
+    user_query: str,
+    db: AsyncSession,
+    user_id: int,
+    conversation: Conversation | None = None,
+) -> AsyncIterator[str]:
+    """Stream the agent's answer as server-sent events.
+
+    ``token`` events carry text as the model produces it, ``tool_call`` and
+    ``tool_result`` report tools as they run, and the stream ends with
+    ``done`` (the full answer and the conversation to continue) or ``error``.
+    """
+    logfire.info("stream_agent_chat", user_id=user_id)
+    started = time.perf_counter()
+    first_byte_ms = None
+
+    async for message in _agent_event_stream(user_query, db, user_id, conversation):
+        if first_byte_ms is None:
+            first_byte_ms = (time.perf_counter() - started) * 1000
+            _time_to_first_byte.record(first_byte_ms, {"streaming": True})
+        yield message
+
+    logfire.info(
+        "stream_agent_chat finished",
+        user_id=user_id,
+        time_to_first_byte_ms=first_byte_ms,
+        duration_ms=(time.perf_counter() - started) * 1000,
+    )
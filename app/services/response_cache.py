@@ -0,0 +1,214 @@
+import hashlib
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+import logfire
+
+from app.core.cache import cache
+from app.core.config import settings
+
+RESPONSE_CACHE_NAMESPACE = "agent:answers"
+
+# ------------------------
+# 🧭 Query Classification
+# ------------------------
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Words that tie a question to the asker's own data
+PERSONAL_WORDS = frozenset(
+    {
+        "i", "me", "my", "mine", "myself", "am", "i'm", "im", "i've", "ive",
+        "i'd", "i'll", "we", "us", "our", "ours", "we're", "we've", "we'd",
+        "we'll",
+    }
+)  # fmt: skip
+
+# Words a question starts with; anything else may be a request to act
+QUESTION_WORDS = frozenset(
+    {
+        "what", "which", "how", "when", "where", "who", "whom", "whose", "why",
+        "do", "does", "is", "are", "can", "could", "would", "will", "should",
+    }
+)  # fmt: skip
+
+# Words ignored when comparing questions. Question words are kept, so
+# "how do ..." and "could you ..." about the same thing stay apart
+STOP_WORDS = frozenset(
+    {
+        "a", "an", "the", "you", "your", "to", "of", "for", "in", "on",
+        "with", "please", "tell", "about", "there", "any", "it",
+    }
+)  # fmt: skip
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case words only, so trivial rephrasings share a key"""
+    return " ".join(_WORD.findall(query.lower()))
+
+
+def is_user_independent(query: str) -> bool:
+    """Whether a query is a question answered the same way for every user.
+
+    Only questions qualify: "Transfer funds between accounts" asks the agent
+    to act, even though it is about the same thing as "How are funds
+    transferred between accounts?". Questions about the asker (``I``,
+    ``my``, ``we``, ...) or carrying numbers (amounts, account or card
+    numbers) never do.
+    """
+    words = normalize_query(query).split()
+    return (
+        bool(words)
+        and words[0] in QUESTION_WORDS
+        and not any(
+            word in PERSONAL_WORDS or any(char.isdigit() for char in word)
+            for word in words
+        )
+    )
+
+
+def embed(text: str) -> dict[str, float]:
+    """Local bag-of-words embedding: unit-length counts of content words"""
+    words = [word for word in text.split() if word not in STOP_WORDS]
+    counts = Counter(words or text.split())
+    norm = math.sqrt(sum(count * count for count in counts.values()))
+    return {word: count / norm for word, count in counts.items()}
+
+
+def similarity(a: dict[str, float], b: dict[str, float]) -> float:
+    """Cosine similarity of two embeddings"""
+    return sum(weight * b.get(word, 0.0) for word, weight in a.items())
+
+
+# ------------------------
+# 💬 Response Cache
+# ------------------------
+
+
+@dataclass
+class _Entry:
+    vector: dict[str, float]
+    answer: str
+    generation: int | None
+    expires_at: float
+
+
+class ResponseCache:
+    """Agent answers to user-independent questions, matched by similarity.
+
+    Entries are indexed in this worker; exact repeats are also shared with
+    other workers through Redis. invalidate() moves the Redis namespace on,
+    which retires the entries of every worker.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, threshold: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lookups = logfire.metric_counter(
+            "agent.response_cache.lookups",
+            description="Agent response cache lookups by result",
+        )
+
+    @staticmethod
+    def _redis_key(text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _record(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        elif result == "miss":
+            self.misses += 1
+        else:
+            self.bypassed += 1
+        self._lookups.add(1, {"result": result})
+
+    def _best_match(self, text: str, generation: int | None) -> _Entry | None:
+        vector = embed(text)
+        now = time.monotonic()
+        best, best_score = None, self.threshold
+        for key, entry in list(self._entries.items()):
+            if entry.expires_at <= now or entry.generation != generation:
+                del self._entries[key]
+                continue
+            score = similarity(vector, entry.vector)
+            if score >= best_score:
+                best, best_score = key, score
+
+        if best is None:
+            return None
+        self._entries.move_to_end(best)
+        return self._entries[best]
+
+    def _remember(self, text: str, answer: str, generation: int | None) -> None:
+        self._entries[text] = _Entry(
+            embed(text), answer, generation, time.monotonic() + self.ttl
+        )
+        self._entries.move_to_end(text)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def lookup(self, query: str) -> str | None:
+        """Cached answer to a similar earlier question, if there is one"""
+        if not is_user_independent(query):
+            self._record("bypass")
+            return None
+
+        text = normalize_query(query)
+        generation = await cache.generation(RESPONSE_CACHE_NAMESPACE)
+        entry = self._best_match(text, generation)
+        answer = entry.answer if entry else None
+        if answer is None:
+            answer = await cache.get_value(
+                self._redis_key(text), namespace=RESPONSE_CACHE_NAMESPACE
+            )
+            if answer is not None:
+                self._remember(text, answer, generation)
+
+        self._record("hit" if answer is not None else "miss")
+        return answer
+
+    async def store(self, query: str, answer: str) -> None:
+        """Cache the answer to a user-independent question"""
+        if not is_user_independent(query):
+            return
+
+        text = normalize_query(query)
+        generation = await cache.generation(RESPONSE_CACHE_NAMESPACE)
+        self._remember(text, answer, generation)
+        await cache.set_value(
+            self._redis_key(text),
+            answer,
+            expire=self.ttl,
+            namespace=RESPONSE_CACHE_NAMESPACE,
+        )
+
+    async def invalidate(self) -> None:
+        """Drop every cached answer, e.g. after the data behind them changed"""
+        self._entries.clear()
+        await cache.invalidate_namespace(RESPONSE_CACHE_NAMESPACE)
+
+    def stats(self) -> dict:
+        """Hit rate of this worker's cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+agent_response_cache = ResponseCache(
+    max_entries=settings.AGENT_RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.AGENT_RESPONSE_CACHE_TTL_SECONDS,
+    threshold=settings.AGENT_RESPONSE_CACHE_SIMILARITY,
+)
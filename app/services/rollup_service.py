@@ -0,0 +1,237 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+import logfire
+from sqlalchemy import Date, cast, delete, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.account import Account
+from app.db.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.db.models.transaction_rollup import TransactionRollup
+
+# ------------------------
+# 🔧 Utility Functions
+# ------------------------
+
+
+def _utc_day(column):
+    """SQL expression for the UTC calendar day of a timestamp"""
+    # Inline the zone so the expression is identical in SELECT and GROUP BY
+    return cast(func.timezone(literal_column("'UTC'"), column), Date)
+
+
+def transaction_day(transaction: Transaction) -> date:
+    """UTC calendar day a stored transaction was bucketed under"""
+    created_at = transaction.created_at or datetime.now(timezone.utc)
+    return created_at.astimezone(timezone.utc).date()
+
+
+# ------------------------
+# 📊 Incremental Maintenance
+# ------------------------
+
+
+async def apply_transaction_rollups(
+    db: AsyncSession,
+    rows: Iterable[dict],
+    day: date | None = None,
+    sign: int = 1,
+) -> None:
+    """Fold ledger rows into the daily rollups inside the caller's transaction.
+
+    ``rows`` are transaction column dicts (``account_id``, ``amount``,
+    ``transaction_type`` and ``status``). When ``day`` is omitted the bucket is
+    the UTC day of ``now()``, which is the same transaction timestamp Postgres
+    uses for ``created_at``. Pass ``sign=-1`` to remove rows again.
+    """
+    buckets = defaultdict(lambda: [0.0, 0.0, 0])
+    for row in rows:
+        bucket = buckets[(row["account_id"], row["transaction_type"], row["status"])]
+        bucket[0] += sign * row["amount"]
+        bucket[1] += sign * abs(row["amount"])
+        bucket[2] += sign
+
+    if not buckets:
+        return
+
+    bucket_day = day if day is not None else _utc_day(func.now())
+    stmt = insert(TransactionRollup).values(
+        [
+            {
+                "account_id": account_id,
+                "day": bucket_day,
+                "transaction_type": transaction_type,
+                "status": transaction_status,
+                "total_amount": total,
+                "total_absolute_amount": absolute_total,
+                "transaction_count": count,
+            }
+            for (account_id, transaction_type, transaction_status), (
+                total,
+                absolute_total,
+                count,
+            ) in buckets.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_transaction_rollups_bucket",
+        set_={
+            "total_amount": TransactionRollup.total_amount + stmt.excluded.total_amount,
+            "total_absolute_amount": TransactionRollup.total_absolute_amount
+            + stmt.excluded.total_absolute_amount,
+            "transaction_count": TransactionRollup.transaction_count
+            + stmt.excluded.transaction_count,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+# ------------------------
+# 📈 Rollup Queries
+# ------------------------
+
+
+async def get_rollup_totals(
+    db: AsyncSession,
+    account_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    transaction_status: TransactionStatus | None = None,
+) -> dict[TransactionType, tuple[float, float, int]]:
+    """Get (total, absolute total, count) per transaction type for an account"""
+    with logfire.span(
+        "get_rollup_totals",
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+    ):
+        stmt = (
+            select(
+                TransactionRollup.transaction_type,
+                func.sum(TransactionRollup.total_amount),
+                func.sum(TransactionRollup.total_absolute_amount),
+                func.sum(TransactionRollup.transaction_count),
+            )
+            .filter(TransactionRollup.account_id == account_id)
+            .group_by(TransactionRollup.transaction_type)
+        )
+
+        if start_date:
+            stmt = stmt.filter(TransactionRollup.day >= start_date)
+
+        if end_date:
+            stmt = stmt.filter(TransactionRollup.day <= end_date)
+
+        if transaction_status:
+            stmt = stmt.filter(TransactionRollup.status == transaction_status)
+
+        result = await db.execute(stmt)
+        return {
+            tx_type: (total, absolute_total, count)
+            for tx_type, total, absolute_total, count in result.all()
+        }
+
+
+async def get_daily_rollups(
+    db: AsyncSession, account_id: int, start_date: date, end_date: date
+) -> list[TransactionRollup]:
+    """Get the daily rollup rows for an account within a date range"""
+    with logfire.span(
+        "get_daily_rollups",
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+    ):
+        result = await db.execute(
+            select(TransactionRollup)
+            .filter(
+                TransactionRollup.account_id == account_id,
+                TransactionRollup.day >= start_date,
+                TransactionRollup.day <= end_date,
+            )
+            .order_by(TransactionRollup.day, TransactionRollup.transaction_type)
+        )
+        return result.scalars().all()
+
+
+# ------------------------
+# 🔁 Backfill
+# ------------------------
+
+
+async def rebuild_transaction_rollups(db: AsyncSession, batch_size: int = 500) -> int:
+    """Rebuild every rollup from the transactions table.
+
+    Accounts are processed in primary key batches. Each batch deletes its
+    rollups and re-aggregates them with a single ``INSERT ... SELECT`` and is
+    committed on its own, so no history is loaded into Python and no single
+    transaction grows with the size of the ledger. Each batch holds a SHARE
+    lock on the transactions table, so writes wait for the batch to commit
+    instead of being counted twice.
+    """
+    with logfire.span("rebuild_transaction_rollups", batch_size=batch_size):
+        last_account_id = 0
+        rebuilt_accounts = 0
+
+        while True:
+            result = await db.execute(
+                select(Account.id)
+                .filter(Account.id > last_account_id)
+                .order_by(Account.id)
+                .limit(batch_size)
+            )
+            account_ids = result.scalars().all()
+            if not account_ids:
+                break
+
+            await db.execute(
+                text(f"LOCK TABLE {Transaction.__tablename__} IN SHARE MODE")
+            )
+            await db.execute(
+                delete(TransactionRollup).filter(
+                    TransactionRollup.account_id.in_(account_ids)
+                )
+            )
+            await db.execute(
+                insert(TransactionRollup).from_select(
+                    [
+                        "account_id",
+                        "day",
+                        "transaction_type",
+                        "status",
+                        "total_amount",
+                        "total_absolute_amount",
+                        "transaction_count",
+                    ],
+                    select(
+                        Transaction.account_id,
+                        _utc_day(Transaction.created_at),
+                        Transaction.transaction_type,
+                        Transaction.status,
+                        func.sum(Transaction.amount),
+                        func.sum(func.abs(Transaction.amount)),
+                        func.count(),
+                    )
+                    .filter(Transaction.account_id.in_(account_ids))
+                    .group_by(
+                        Transaction.account_id,
+                        _utc_day(Transaction.created_at),
+                        Transaction.transaction_type,
+                        Transaction.status,
+                    ),
+                )
+            )
+            await db.commit()
+
+            rebuilt_accounts += len(account_ids)
+            last_account_id = account_ids[-1]
+            logfire.info(
+                "Rebuilt transaction rollups",
+                accounts=rebuilt_accounts,
+                last_account_id=last_account_id,
+            )
+
+        return rebuilt_accounts
@@ -0,0 +1,270 @@
+import heapq
+import json
+import os
+import time
+import uuid
+from datetime import timedelta
+
+import logfire
+import redis.asyncio as redis
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    verify_refresh_token,
+)
+from app.db.models.user import User
+from app.schemas.user import Token, TokenData
+
+# ------------------------
+# 🗄️ Refresh Token Store
+# ------------------------
+#
+# Every login starts a token family. Only the newest refresh token of a family
+# is stored; using it swaps it for a new one. Presenting a token that is no
+# longer stored (already rotated, logged out or revoked) revokes the whole
+# family, so a stolen refresh token stops working as soon as either party
+# uses it.
+
+
+def _token_key(jti: str) -> str:
+    return f"refresh:token:{jti}"
+
+
+def _family_key(family: str) -> str:
+    return f"refresh:family:{family}"
+
+
+def _user_families_key(user_id: int) -> str:
+    return f"refresh:user:{user_id}"
+
+
+class RedisRefreshTokenStore:
+    """Refresh tokens shared by every worker through Redis"""
+
+    def __init__(self, client: redis.Redis):
+        self.redis = client
+
+    async def save(self, jti: str, user_id: int, family: str, ttl: int) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(_token_key(jti), json.dumps([user_id, family]), ex=ttl)
+            pipe.set(_family_key(family), jti, ex=ttl)
+            pipe.sadd(_user_families_key(user_id), family)
+            pipe.expire(_user_families_key(user_id), ttl)
+            await pipe.execute()
+
+    async def consume(self, jti: str) -> tuple[int, str] | None:
+        value = await self.redis.getdel(_token_key(jti))
+        return tuple(json.loads(value)) if value else None
+
+    async def revoke_family(self, family: str) -> None:
+        jti = await self.redis.getdel(_family_key(family))
+        if jti:
+            await self.redis.delete(_token_key(jti.decode()))
+
+    async def revoke_user(self, user_id: int) -> None:
+        families = await self.redis.smembers(_user_families_key(user_id))
+        for family in families:
+            await self.revoke_family(family.decode())
+        await self.redis.delete(_user_families_key(user_id))
+
+
+class MemoryRefreshTokenStore:
+    """Single-process fallback used when Redis is not configured.
+
+    Expired tokens and families are evicted on access, so the store stays
+    bounded by the sessions still alive. Reuse detection only covers tokens
+    issued by this process.
+    """
+
+    def __init__(self):
+        self._tokens: dict[str, tuple[int, str, float]] = {}
+        self._families: dict[str, tuple[str, int]] = {}
+        self._user_families: dict[int, set[str]] = {}
+        self._expiry: list[tuple[float, str, str]] = []  # heap of (at, jti, family)
+
+    def _forget_family(self, family: str) -> str | None:
+        entry = self._families.pop(family, None)
+        if entry is None:
+            return None
+        jti, user_id = entry
+        families = self._user_families.get(user_id)
+        if families is not None:
+            families.discard(family)
+            if not families:
+                del self._user_families[user_id]
+        return jti
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti, family = heapq.heappop(self._expiry)
+            self._tokens.pop(jti, None)
+            if self._families.get(family, (None,))[0] == jti:
+                self._forget_family(family)
+
+    async def save(self, jti: str, user_id: int, family: str, ttl: int) -> None:
+        self._evict_expired()
+        expires_at = time.monotonic() + ttl
+        self._tokens[jti] = (user_id, family, expires_at)
+        self._families[family] = (jti, user_id)
+        self._user_families.setdefault(user_id, set()).add(family)
+        heapq.heappush(self._expiry, (expires_at, jti, family))
+
+    async def consume(self, jti: str) -> tuple[int, str] | None:
+        self._evict_expired()
+        entry = self._tokens.pop(jti, None)
+        return (entry[0], entry[1]) if entry else None
+
+    async def revoke_family(self, family: str) -> None:
+        self._evict_expired()
+        jti = self._forget_family(family)
+        if jti:
+            self._tokens.pop(jti, None)
+
+    async def revoke_user(self, user_id: int) -> None:
+        for family in list(self._user_families.get(user_id, ())):
+            await self.revoke_family(family)
+
+
+_memory_store = MemoryRefreshTokenStore()
+
+
+def get_refresh_token_store() -> RedisRefreshTokenStore | MemoryRefreshTokenStore:
+    if cache.redis:
+        return RedisRefreshTokenStore(cache.redis)
+    return _memory_store
+
+
+def warn_if_refresh_tokens_per_worker() -> None:
+    """Warn when several workers would each keep their own refresh tokens"""
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1 and not cache.redis:
+        logfire.warn(
+            "Refresh tokens are kept per worker without Redis; set REDIS_URL "
+            "so rotation and reuse detection work across workers",
+            workers=workers,
+        )
+
+
+# ------------------------
+# 🔑 Token Issuing
+# ------------------------
+
+
+def auth_namespace(user_id: int) -> str:
+    """Namespace whose generation is embedded in a user's access tokens"""
+    return f"auth:{user_id}"
+
+
+async def create_access_token_for_user(user: User) -> str:
+    """Create an access token carrying the claims needed to skip the DB"""
+    claims = {
+        "sub": user.email,
+        "uid": user.id,
+        "name": user.full_name,
+        "active": bool(user.is_active),
+        "su": bool(user.is_superuser),
+        "roles": list(user.roles or []),
+    }
+    generation = await cache.generation(auth_namespace(user.id))
+    if generation is not None:
+        claims["gen"] = generation
+
+    return create_access_token(
+        data=claims,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+async def issue_tokens(user: User, family: str | None = None) -> Token:
+    """Issue an access token and a refresh token, starting a family if needed"""
+    family = family or uuid.uuid4().hex
+    jti = uuid.uuid4().hex
+    ttl = settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+
+    refresh_token = create_refresh_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "jti": jti,
+            "fam": family,
+            "type": "refresh",
+        },
+        expires_delta=timedelta(seconds=ttl),
+    )
+    await get_refresh_token_store().save(jti, user.id, family, ttl)
+
+    return Token(
+        access_token=await create_access_token_for_user(user),
+        refresh_token=refresh_token,
+        token_type="bearer",
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> Token:
+    """Swap a refresh token for a new token pair"""
+    claims = verify_refresh_token(refresh_token)
+    with logfire.span("rotate_refresh_token", user_id=claims.get("uid")):
+        store = get_refresh_token_store()
+        stored = await store.consume(claims["jti"])
+        if stored is None:
+            # Already used or revoked: assume the token leaked
+            await store.revoke_family(claims["fam"])
+            logfire.warn("Refresh token reuse detected", user_id=claims.get("uid"))
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        user_id, family = stored
+        user = await db.get(User, user_id)
+        if not user or not user.is_active:
+            await store.revoke_family(family)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User is inactive or no longer exists",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        return await issue_tokens(user, family)
+
+
+async def revoke_refresh_token(refresh_token: str) -> None:
+    """Log out: revoke the family the refresh token belongs to"""
+    claims = verify_refresh_token(refresh_token)
+    await get_refresh_token_store().revoke_family(claims["fam"])
+
+
+async def revoke_user_tokens(user_id: int) -> None:
+    """Revoke every refresh token of a user, e.g. after a password change"""
+    await get_refresh_token_store().revoke_user(user_id)
+
+
+async def get_principal_from_claims(token_data: TokenData) -> User | None:
+    """Build the current user from access-token claims without touching the DB.
+
+    Only used while the token's generation matches the user's current one;
+    any profile, status or password change moves the generation on, and
+    callers then fall back to a lookup.
+    """
+    if token_data.user_id is None or token_data.generation is None:
+        return None
+
+    generation = await cache.generation(auth_namespace(token_data.user_id))
+    if generation != token_data.generation:
+        return None
+
+    return User(
+        id=token_data.user_id,
+        email=token_data.email,
+        full_name=token_data.full_name,
+        is_active=token_data.is_active,
+        is_superuser=token_data.is_superuser,
+        roles=token_data.roles,
+    )
@@ -1,13 +1,20 @@
+import calendar
+import csv
+import enum
+import io
+import json
 import uuid
-from typing import List
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, List
 
 import logfire
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Select, insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.account import Account
 from app.db.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.db.session import replica_read
 from app.schemas.transaction import (
     DepositRequest,
     TransactionCreate,
@@ -18,8 +25,15 @@ from app.schemas.transaction import (
 from app.services.account_service import (
     get_account_by_id,
     get_account_by_number,
-    update_account_balance,
+    invalidate_account_cache,
 )
+from app.services.rollup_service import (
+    apply_transaction_rollups,
+    get_daily_rollups,
+    get_rollup_totals,
+    transaction_day,
+)
+from app.utils.helpers import decode_cursor
 
 # ------------------------
 # 🔧 Utility Functions
@@ -43,6 +57,25 @@ async def _verify_transaction_ownership(
         )
 
 
+def paginate_transactions(stmt: Select, limit: int, cursor: str | None) -> Select:
+    """Apply newest-first keyset pagination over (created_at, id)"""
+    if cursor:
+        try:
+            created_at, transaction_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        stmt = stmt.filter(
+            tuple_(Transaction.created_at, Transaction.id)
+            < tuple_(created_at, transaction_id)
+        )
+
+    return stmt.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(
+        limit
+    )
+
+
 # ------------------------
 # 💰 Transaction CRUD Functions
 # ------------------------
@@ -78,6 +111,9 @@ async def create_transaction(
         )
 
         db.add(transaction)
+        await apply_transaction_rollups(
+            db, [{**transaction_dict, "status": transaction_status}]
+        )
         await db.commit()
         await db.refresh(transaction)
         return transaction
@@ -100,6 +136,7 @@ async def get_transaction_by_reference(db: AsyncSession, reference: str) -> Tran
         return result.scalar_one_or_none()
 
 
+@replica_read
 async def get_transactions(
     db: AsyncSession, query: TransactionQuery
 ) -> List[Transaction]:
@@ -119,55 +156,120 @@ async def get_transactions(
         if query.end_date:
             stmt = stmt.filter(Transaction.created_at <= query.end_date)
 
-        stmt = stmt.offset(query.offset).limit(query.limit)
-        stmt = stmt.order_by(Transaction.created_at.desc())
+        if query.offset:
+            stmt = stmt.offset(query.offset)
+        stmt = paginate_transactions(stmt, query.limit, query.cursor)
 
         result = await db.execute(stmt)
         return result.scalars().all()
 
 
+@replica_read
 async def get_user_all_transactions(
-    db: AsyncSession, user_id: int, limit: int = 50
+    db: AsyncSession, user_id: int, limit: int = 50, cursor: str | None = None
 ) -> List[Transaction]:
     """Get all transactions for a user across all accounts"""
     with logfire.span("get_user_all_transactions", user_id=user_id, limit=limit):
-        # Simple direct query - no need for complex filtering
-        result = await db.execute(
-            select(Transaction)
-            .join(Account)
-            .filter(Account.user_id == user_id)
-            .order_by(Transaction.created_at.desc())
-            .limit(limit)
-        )
+        stmt = select(Transaction).join(Account).filter(Account.user_id == user_id)
+        result = await db.execute(paginate_transactions(stmt, limit, cursor))
         return result.scalars().all()
 
 
-async def get_transaction_summary(db: AsyncSession, account_id: int) -> dict:
-    with logfire.span("get_transaction_summary", account_id=account_id):
-        """Get transaction summary for an account"""
-        deposit_stmt = select(Transaction.transaction_type, Transaction.amount).filter(
-            Transaction.account_id == account_id
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.reference,
+    Transaction.account_id,
+    Transaction.card_id,
+    Transaction.transaction_type,
+    Transaction.status,
+    Transaction.amount,
+    Transaction.description,
+    Transaction.merchant,
+    Transaction.transfer_id,
+    Transaction.created_at,
+)
+
+
+def _export_value(value):
+    """Convert a column value to its plain CSV/JSON representation"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def export_user_transactions(
+    db: AsyncSession,
+    user_id: int,
+    export_format: str = "csv",
+    batch_size: int = 500,
+) -> AsyncIterator[str]:
+    """Stream a user's full history as CSV or NDJSON text chunks.
+
+    Rows are read through a server-side cursor ``batch_size`` at a time and
+    encoded straight from the result tuples, so memory stays flat no matter
+    how long the history is.
+    """
+    logfire.info(
+        "export_user_transactions", user_id=user_id, export_format=export_format
+    )
+    columns = [column.key for column in EXPORT_COLUMNS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if export_format == "csv":
+        writer.writerow(columns)
+
+    result = await db.stream(
+        select(*EXPORT_COLUMNS)
+        .join(Account)
+        .filter(Account.user_id == user_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        for row in partition:
+            values = [_export_value(value) for value in row]
+            if export_format == "csv":
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values))) + "\n")
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def get_transaction_summary(
+    db: AsyncSession,
+    account_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    transaction_status: TransactionStatus | None = None,
+) -> dict:
+    """Get transaction summary for an account from the daily rollups"""
+    with logfire.span(
+        "get_transaction_summary",
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        transaction_status=transaction_status,
+    ):
+        totals = await get_rollup_totals(
+            db, account_id, start_date, end_date, transaction_status
         )
-        result = await db.execute(deposit_stmt)
-        transactions = result.fetchall()
 
         summary = {
-            "total_deposits": 0,
-            "total_withdrawals": 0,
-            "total_transfers": 0,
-            "total_payments": 0,
+            "total_deposits": totals.get(TransactionType.DEPOSIT, (0, 0, 0))[0],
+            "total_withdrawals": totals.get(TransactionType.WITHDRAWAL, (0, 0, 0))[1],
+            "total_transfers": totals.get(TransactionType.TRANSFER, (0, 0, 0))[1],
+            "total_payments": totals.get(TransactionType.PAYMENT, (0, 0, 0))[1],
         }
 
-        for tx_type, amount in transactions:
-            if tx_type == TransactionType.DEPOSIT:
-                summary["total_deposits"] += amount
-            elif tx_type == TransactionType.WITHDRAWAL:
-                summary["total_withdrawals"] += abs(amount)
-            elif tx_type == TransactionType.TRANSFER:
-                summary["total_transfers"] += abs(amount)
-            elif tx_type == TransactionType.PAYMENT:
-                summary["total_payments"] += abs(amount)
-
         summary["net_flow"] = (
             summary["total_deposits"]
             - summary["total_withdrawals"]
@@ -178,6 +280,35 @@ async def get_transaction_summary(db: AsyncSession, account_id: int) -> dict:
         return summary
 
 
+async def get_monthly_statement(
+    db: AsyncSession, account_id: int, year: int, month: int
+) -> dict:
+    """Get per-day and per-type totals for one calendar month"""
+    with logfire.span(
+        "get_monthly_statement", account_id=account_id, year=year, month=month
+    ):
+        start_date = date(year, month, 1)
+        end_date = date(year, month, calendar.monthrange(year, month)[1])
+        rollups = await get_daily_rollups(db, account_id, start_date, end_date)
+
+        days: dict[date, dict] = {}
+        for rollup in rollups:
+            day = days.setdefault(
+                rollup.day, {"date": rollup.day, "net_flow": 0.0, "count": 0}
+            )
+            day["net_flow"] += rollup.total_amount
+            day["count"] += rollup.transaction_count
+
+        summary = await get_transaction_summary(db, account_id, start_date, end_date)
+        return {
+            "account_id": account_id,
+            "year": year,
+            "month": month,
+            "summary": summary,
+            "days": list(days.values()),
+        }
+
+
 async def delete_transaction(
     db: AsyncSession, transaction_id: int, user_id: int
 ) -> bool:
@@ -189,6 +320,19 @@ async def delete_transaction(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found"
             )
         await _verify_transaction_ownership(db, transaction, user_id)
+        await apply_transaction_rollups(
+            db,
+            [
+                {
+                    "account_id": transaction.account_id,
+                    "amount": transaction.amount,
+                    "transaction_type": transaction.transaction_type,
+                    "status": transaction.status,
+                }
+            ],
+            day=transaction_day(transaction),
+            sign=-1,
+        )
         await db.delete(transaction)
         await db.commit()
         return True
@@ -231,6 +375,7 @@ async def deposit_funds(
 
         transaction = await create_transaction(db, transaction_data)
         await db.commit()
+        await invalidate_account_cache([account])
         return transaction
 
 
@@ -272,71 +417,125 @@ async def withdraw_funds(
 
         transaction = await create_transaction(db, transaction_data)
         await db.commit()
+        await invalidate_account_cache([account])
         return transaction
 
 
-async def transfer_funds(
-    db: AsyncSession, transfer_data: TransferRequest, user_id: int
-) -> dict:
-    """Transfer funds between accounts"""
-    with logfire.span("transfer_funds", transfer_data=transfer_data, user_id=user_id):
-        from_account = await get_account_by_number(
-            db, transfer_data.from_account_number
+async def _lock_accounts_by_number(
+    db: AsyncSession, account_numbers: Iterable[str]
+) -> dict[str, Account]:
+    """Load and row-lock accounts by number in a single round trip.
+
+    Rows are locked in primary key order so concurrent transfers touching the
+    same pair of accounts always acquire their locks in the same order and
+    cannot deadlock each other.
+    """
+    result = await db.execute(
+        select(Account)
+        .where(Account.account_number.in_(set(account_numbers)))
+        .order_by(Account.id)
+        .with_for_update()
+    )
+    return {account.account_number: account for account in result.scalars().all()}
+
+
+def _apply_transfer(
+    accounts: dict[str, Account], transfer_data: TransferRequest, user_id: int
+) -> tuple[Account, Account]:
+    """Validate a transfer against locked accounts and move the funds in memory"""
+    if transfer_data.from_account_number == transfer_data.to_account_number:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot transfer to the same account",
         )
-        to_account = await get_account_by_number(db, transfer_data.to_account_number)
 
-        if not from_account or not to_account:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="One or both accounts not found",
-            )
+    from_account = accounts.get(transfer_data.from_account_number)
+    to_account = accounts.get(transfer_data.to_account_number)
 
-        # Check if user owns the from_account (if user_id is provided)
-        if user_id and from_account.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to transfer from this account",
-            )
+    if not from_account or not to_account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or both accounts not found",
+        )
 
-        if from_account.balance < transfer_data.amount:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient funds"
-            )
+    # Check if user owns the from_account (if user_id is provided)
+    if user_id and from_account.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to transfer from this account",
+        )
 
-        # Update balances
-        await update_account_balance(db, from_account.id, -transfer_data.amount)
-        await update_account_balance(db, to_account.id, transfer_data.amount)
+    if from_account.balance < transfer_data.amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient funds"
+        )
 
-        # Generate a transfer ID to link the two transactions
-        transfer_id = await generate_transaction_reference()
+    from_account.balance -= transfer_data.amount
+    from_account.available_balance -= transfer_data.amount
+    to_account.balance += transfer_data.amount
+    to_account.available_balance += transfer_data.amount
+    return from_account, to_account
+
+
+async def _transfer_ledger_rows(
+    from_account: Account, to_account: Account, transfer_data: TransferRequest
+) -> tuple[str, list[dict]]:
+    """Build the outgoing and incoming ledger legs for a transfer"""
+    # Generate a transfer ID to link the two transactions
+    transfer_id = await generate_transaction_reference()
+    rows = [
+        {
+            "account_id": from_account.id,
+            "amount": -transfer_data.amount,
+            "transaction_type": TransactionType.TRANSFER,
+            "status": TransactionStatus.COMPLETED,
+            "description": f"Transfer to {to_account.account_number} - {transfer_data.description}",
+            "reference": await generate_transaction_reference(),
+            "transfer_id": transfer_id,
+        },
+        {
+            "account_id": to_account.id,
+            "amount": transfer_data.amount,
+            "transaction_type": TransactionType.TRANSFER,
+            "status": TransactionStatus.COMPLETED,
+            "description": f"Transfer from {from_account.account_number} - {transfer_data.description}",
+            "reference": await generate_transaction_reference(),
+            "transfer_id": transfer_id,
+        },
+    ]
+    return transfer_id, rows
 
-        # Outgoing transaction
-        outgoing_tx_data = TransactionCreate(
-            account_id=from_account.id,
-            amount=-transfer_data.amount,
-            transaction_type=TransactionType.TRANSFER,
-            description=f"Transfer to {to_account.account_number} - {transfer_data.description}",
-            reference=await generate_transaction_reference(),
-        )
 
-        # Incoming transaction
-        incoming_tx_data = TransactionCreate(
-            account_id=to_account.id,
-            amount=transfer_data.amount,
-            transaction_type=TransactionType.TRANSFER,
-            description=f"Transfer from {from_account.account_number} - {transfer_data.description}",
-            reference=await generate_transaction_reference(),
-        )
+async def transfer_funds(
+    db: AsyncSession, transfer_data: TransferRequest, user_id: int
+) -> dict:
+    """Transfer funds between accounts atomically.
 
-        # Create transactions
-        outgoing_tx = await create_transaction(db, outgoing_tx_data)
-        incoming_tx = await create_transaction(db, incoming_tx_data)
+    Both accounts are locked with ``SELECT ... FOR UPDATE``, both balances are
+    adjusted and both ledger legs are written in one database transaction, so a
+    failure at any point leaves neither account touched.
+    """
+    with logfire.span("transfer_funds", transfer_data=transfer_data, user_id=user_id):
+        try:
+            accounts = await _lock_accounts_by_number(
+                db,
+                [transfer_data.from_account_number, transfer_data.to_account_number],
+            )
+            from_account, to_account = _apply_transfer(accounts, transfer_data, user_id)
+            transfer_id, rows = await _transfer_ledger_rows(
+                from_account, to_account, transfer_data
+            )
+            db.add_all([Transaction(**row) for row in rows])
+            await apply_transaction_rollups(db, rows)
 
-        # Update both transactions with the transfer_id
-        outgoing_tx.transfer_id = transfer_id
-        incoming_tx.transfer_id = transfer_id
+            # Single commit flushes both balance updates and both ledger legs
+            await db.commit()
+        except Exception:
+            # Release the row locks and discard any partially applied changes
+            await db.rollback()
+            raise
 
-        await db.commit()
+        await invalidate_account_cache([from_account, to_account])
 
         return {
             "message": "Transfer completed successfully",
@@ -348,6 +547,68 @@ async def transfer_funds(
         }
 
 
+async def transfer_funds_batch(
+    db: AsyncSession, transfers: List[TransferRequest], user_id: int
+) -> dict:
+    """Apply many transfers as one all-or-nothing batch.
+
+    Every account referenced by the batch is resolved and locked with a single
+    ``IN`` query, balances are validated in memory in submission order, and all
+    ledger legs are written with one multi-row insert before a single commit.
+    """
+    with logfire.span("transfer_funds_batch", count=len(transfers), user_id=user_id):
+        account_numbers = {
+            number
+            for item in transfers
+            for number in (item.from_account_number, item.to_account_number)
+        }
+        results = []
+        ledger_rows = []
+
+        try:
+            accounts = await _lock_accounts_by_number(db, account_numbers)
+
+            for index, transfer_data in enumerate(transfers):
+                try:
+                    from_account, to_account = _apply_transfer(
+                        accounts, transfer_data, user_id
+                    )
+                except HTTPException as e:
+                    raise HTTPException(
+                        status_code=e.status_code,
+                        detail=f"Transfer {index} failed: {e.detail}",
+                    )
+
+                transfer_id, rows = await _transfer_ledger_rows(
+                    from_account, to_account, transfer_data
+                )
+                ledger_rows.extend(rows)
+                results.append(
+                    {
+                        "transfer_id": transfer_id,
+                        "from_account": from_account.account_number,
+                        "to_account": to_account.account_number,
+                        "amount": transfer_data.amount,
+                    }
+                )
+
+            await db.execute(insert(Transaction), ledger_rows)
+            await apply_transaction_rollups(db, ledger_rows)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        await invalidate_account_cache(accounts.values())
+
+        return {
+            "message": "Batch transfer completed successfully",
+            "count": len(results),
+            "total_amount": sum(item["amount"] for item in results),
+            "transfers": results,
+        }
+
+
 async def create_interbank_transfer(
     db: AsyncSession,
     from_account_id: int,
@@ -389,6 +650,7 @@ async def create_interbank_transfer(
         )
 
         await db.commit()
+        await invalidate_account_cache([from_account])
 
         return {
             "message": "Inter-bank transfer initiated",
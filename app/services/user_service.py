@@ -3,9 +3,12 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.security import get_password_hash_async, verify_password_async
 from app.db.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserResponse, UserUpdate
+from app.services.token_service import auth_namespace, revoke_user_tokens
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User:
@@ -15,6 +18,39 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User:
         return result.scalar_one_or_none()
 
 
+def _principal_cache_key(subject: str) -> str:
+    return f"principal:{subject}"
+
+
+async def get_cached_principal(db: AsyncSession, email: str) -> User | None:
+    """Get the user behind a token subject, cached for a short TTL.
+
+    The cached copy holds the public profile only (no password hash) and is
+    returned as a detached ``User``, so it must not be modified and committed.
+    """
+
+    async def load() -> UserResponse | None:
+        user = await get_user_by_email(db, email)
+        return UserResponse.model_validate(user) if user else None
+
+    principal = await cache.get_or_load(
+        _principal_cache_key(email),
+        load,
+        type_=UserResponse,
+        expire=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        local=True,
+    )
+    if principal is None:
+        return None
+    return User(**principal.model_dump())
+
+
+async def invalidate_user_cache(user_id: int, *emails: str) -> None:
+    """Drop cached principals and stale token claims so changes apply at once"""
+    await cache.delete(*{_principal_cache_key(email) for email in emails})
+    await cache.invalidate_namespace(auth_namespace(user_id))
+
+
 async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
     """Get user by ID"""
     with logfire.span("get_user_by_id", user_id=user_id):
@@ -31,7 +67,7 @@ async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
                 detail="Email already registered",
             )
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         user = User(
             email=user_data.email,
             hashed_pwd=hashed_password,
@@ -48,7 +84,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     """Authenticate user with email and password"""
     with logfire.span("authenticate_user", email=email):
         user = await get_user_by_email(db, email)
-        if not user or not verify_password(password, user.hashed_pwd):
+        if not user or not await verify_password_async(password, user.hashed_pwd):
             return None
         return user
 
@@ -59,11 +95,15 @@ async def change_user_password(
     """Change user password"""
     with logfire.span("change_password", user_id=user_id):
         user = await get_user_by_id(db, user_id)
-        if not user or not verify_password(current_password, user.hashed_pwd):
+        if not user or not await verify_password_async(
+            current_password, user.hashed_pwd
+        ):
             return False
 
-        user.hashed_pwd = get_password_hash(new_password)
+        user.hashed_pwd = await get_password_hash_async(new_password)
         await db.commit()
+        await invalidate_user_cache(user.id, user.email)
+        await revoke_user_tokens(user.id)
         return True
 
 
@@ -87,12 +127,15 @@ async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate) ->
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
+        previous_email = user.email
         update_data = user_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(user, field, value)
 
         await db.commit()
         await db.refresh(user)
+        # Tokens issued for the old email must stop resolving as well
+        await invalidate_user_cache(user.id, previous_email, user.email)
         return user
 
 
@@ -108,6 +151,9 @@ async def update_user_status(db: AsyncSession, user_id: int, is_active: bool) ->
         user.is_active = is_active  # type: ignore
         await db.commit()
         await db.refresh(user)
+        await invalidate_user_cache(user.id, user.email)
+        if not is_active:
+            await revoke_user_tokens(user.id)
         return user
 
 
@@ -122,4 +168,6 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
 
         await db.delete(user)
         await db.commit()
+        await invalidate_user_cache(user.id, user.email)
+        await revoke_user_tokens(user.id)
         return True
@@ -4,6 +4,7 @@ CACHE_EXPIRE_SECONDS = 300  # 5 minutes
 # Account Constants
 MIN_ACCOUNT_BALANCE = 0.0
 MAX_TRANSACTION_AMOUNT = 1000000.0
+MAX_BATCH_TRANSFERS = 1000
 
 # Transaction Constants
 TRANSACTION_STATUS_PENDING = "pending"
@@ -1,4 +1,8 @@
+import base64
+import json
 import re
+from datetime import datetime
+from typing import Any, Sequence
 
 
 def validate_email(email: str) -> bool:
@@ -28,3 +32,32 @@ def mask_account_number(account_number: str) -> str:
     if len(account_number) > 4:
         return f"****{account_number[-4:]}"
     return account_number
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor"""
+    payload = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if invalid"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def next_cursor(items: Sequence[Any], limit: int) -> str | None:
+    """Cursor for the page after ``items``, or None when it was the last page"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
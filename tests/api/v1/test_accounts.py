@@ -4,6 +4,7 @@ import pytest
 from tests.helpers import (
     create_bank,
     create_user_account,
+    deposit,
     generate_unique_email,
     get_auth_token,
     get_user_accounts,
@@ -96,3 +97,25 @@ async def test_account_balance_initialization(client):
 
     assert account_data["balance"] == 0.0
     assert account_data["status"] == "active"
+
+
+@pytest.mark.asyncio
+async def test_cached_balance_refreshes_after_deposit(client):
+    """Test that balance reads are not served stale after a deposit"""
+    token = await get_auth_token(client, generate_unique_email())
+    await create_bank(client, token)
+    account_number = (await create_user_account(client, token)).json()[
+        "account_number"
+    ]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Warm the cache
+    balance_url = f"/api/v1/accounts/{account_number}/balance"
+    assert (await client.get(balance_url, headers=headers)).json()["balance"] == 0.0
+    await get_user_accounts(client, token)
+
+    await deposit(client, token, account_number, 125.0)
+
+    assert (await client.get(balance_url, headers=headers)).json()["balance"] == 125.0
+    accounts = (await get_user_accounts(client, token)).json()
+    assert accounts[0]["balance"] == 125.0
@@ -0,0 +1,440 @@
+import asyncio
+import json
+import time
+
+import pytest
+from pydantic_ai.messages import (
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+from sqlalchemy import text
+
+from app.db.session import get_db
+from app.main import app
+from app.services import llm_agent
+from app.services.llm_agent import banking_agent
+from app.services.response_cache import ResponseCache
+from tests.helpers import create_user_account, get_auth_token
+
+
+@pytest.fixture(autouse=True)
+def response_cache(monkeypatch):
+    """Fresh agent response cache per test"""
+    fresh = ResponseCache(max_entries=10, ttl=60, threshold=0.85)
+    monkeypatch.setattr(llm_agent, "agent_response_cache", fresh)
+    return fresh
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _accounts_then_answer(messages, info):
+    """Fake model: look up the accounts, then answer in a few chunks"""
+    tool_returns = [p for p in messages[-1].parts if isinstance(p, ToolReturnPart)]
+    if not tool_returns:
+        yield {0: DeltaToolCall(name="get_user_accounts", json_args="{}")}
+        return
+
+    yield "You have "
+    yield f"{len(tool_returns[0].content)} "
+    yield "account."
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_sends_tool_progress_and_tokens(client):
+    """Test streaming a chat answer as server-sent events"""
+    token = await get_auth_token(client)
+    await create_user_account(client, token)
+
+    with banking_agent.override(
+        model=FunctionModel(stream_function=_accounts_then_answer)
+    ):
+        response = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "How many accounts do I have?"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    assert events[0] == ("tool_call", {"tool": "get_user_accounts"})
+    assert events[1] == ("tool_result", {"tool": "get_user_accounts"})
+    tokens = [data["delta"] for name, data in events if name == "token"]
+    assert tokens == ["You have ", "1 ", "account."]
+    name, data = events[-1]
+    assert name == "done"
+    assert data["response"] == "You have 1 account."
+    assert data["conversation_id"] is not None
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_errors_as_events(client):
+    """Test that a failing model ends the stream with an error event"""
+    token = await get_auth_token(client)
+
+    async def failing_model(messages, info):
+        raise RuntimeError("model unavailable")
+        yield  # pragma: no cover
+
+    with banking_agent.override(model=FunctionModel(stream_function=failing_model)):
+        response = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "Hello"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == 200
+    assert [name for name, _ in _parse_sse(response.text)] == ["error"]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_keeps_the_request_session_open(client, db):
+    """Test that the yield-dependency session stays open until the stream ends"""
+    token = await get_auth_token(client)
+    session_open = []
+
+    async def tracked_get_db():
+        session_open.append(True)
+        try:
+            yield db
+        finally:
+            session_open[-1] = False
+
+    async def report_session(messages, info):
+        yield "open" if session_open[-1] else "closed"
+
+    app.dependency_overrides[get_db] = tracked_get_db
+    with banking_agent.override(model=FunctionModel(stream_function=report_session)):
+        response = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "Is the session open?"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    tokens = [
+        data["delta"] for name, data in _parse_sse(response.text) if name == "token"
+    ]
+    assert tokens == ["open"]
+    assert session_open == [False]
+
+
+async def _three_lookups_then_answer(messages, info):
+    """Fake model: ask for three independent lookups in a single turn"""
+    if not any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+        yield {
+            0: DeltaToolCall("get_user_accounts", "{}", tool_call_id="accounts"),
+            1: DeltaToolCall("get_user_payment_cards", "{}", tool_call_id="cards"),
+            2: DeltaToolCall("get_user_profile", "{}", tool_call_id="profile"),
+        }
+        return
+    yield "Done."
+
+
+@pytest.mark.asyncio
+async def test_read_only_tools_run_concurrently_on_own_sessions(
+    client, db, monkeypatch
+):
+    """Test that independent read-only tools don't share the request session"""
+    token = await get_auth_token(client)
+    sessions = []
+
+    async def slow_lookup(session, user_id):
+        sessions.append(session)
+        await session.execute(text("SELECT pg_sleep(0.3)"))
+        return []
+
+    monkeypatch.setattr(llm_agent, "get_cached_user_accounts", slow_lookup)
+    monkeypatch.setattr(llm_agent, "get_user_cards", slow_lookup)
+    monkeypatch.setattr(llm_agent, "get_user_by_id", slow_lookup)
+
+    started = time.perf_counter()
+    with banking_agent.override(
+        model=FunctionModel(stream_function=_three_lookups_then_answer)
+    ):
+        response = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "Show me everything"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert len({id(session) for session in sessions}) == 3
+    assert db not in sessions
+    assert elapsed < 0.8  # three 0.3s queries back to back would take 0.9s
+
+
+def test_writing_tools_run_alone():
+    tools = banking_agent._function_toolset.tools
+    for name in (
+        "transfer_funds_between_accounts",
+        "deposit_funds_into_accounts",
+        "withdraw_funds_an_account",
+    ):
+        assert tools[name].sequential
+    assert not tools["get_user_accounts"].sequential
+
+
+async def _deposit_among_lookups(messages, info):
+    """Fake model: ask for a deposit and two lookups in a single turn"""
+    if not any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+        deposit = {"request": {"account_number": "A1", "amount": 10}}
+        yield {
+            0: DeltaToolCall("get_user_accounts", "{}", tool_call_id="accounts"),
+            1: DeltaToolCall(
+                "deposit_funds_into_accounts",
+                json.dumps(deposit),
+                tool_call_id="deposit",
+            ),
+            2: DeltaToolCall("get_user_payment_cards", "{}", tool_call_id="cards"),
+        }
+        return
+    yield "Done."
+
+
+@pytest.mark.asyncio
+async def test_writing_tool_never_overlaps_other_tools(client, monkeypatch):
+    """Test that a write requested alongside reads runs on its own"""
+    token = await get_auth_token(client)
+    events = []
+
+    def tracked(name, result):
+        async def call(*args):
+            events.append(f"start {name}")
+            await asyncio.sleep(0.05)
+            events.append(f"end {name}")
+            return result
+
+        return call
+
+    transaction = type("Transaction", (), {"reference": "REF1"})()
+    monkeypatch.setattr(llm_agent, "get_cached_user_accounts", tracked("read", []))
+    monkeypatch.setattr(llm_agent, "get_user_cards", tracked("read", []))
+    monkeypatch.setattr(llm_agent, "deposit_funds", tracked("write", transaction))
+
+    with banking_agent.override(
+        model=FunctionModel(stream_function=_deposit_among_lookups)
+    ):
+        response = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "Deposit 10 into A1 and show my accounts"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == 200
+    write = events.index("start write")
+    assert events[write + 1] == "end write"
+    assert events.count("start read") == 2
+
+
+_MEMO_SCRIPT = [
+    [("get_user_accounts", {})],
+    [
+        ("get_user_accounts", {}),
+        ("get_account_balance_details", {"account_number": "A1"}),
+    ],
+    [("get_account_balance_details", {"account_number": "A1"})],
+    [
+        (
+            "deposit_funds_into_accounts",
+            {"request": {"account_number": "A1", "amount": 10}},
+        )
+    ],
+    [("get_user_accounts", {})],
+]
+
+
+async def _scripted_tool_calls(messages, info):
+    """Fake model: make the tool calls of _MEMO_SCRIPT, one turn at a time"""
+    turn = sum(isinstance(message, ModelResponse) for message in messages)
+    if turn == len(_MEMO_SCRIPT):
+        yield "Done."
+        return
+    yield {
+        index: DeltaToolCall(name, json.dumps(args), tool_call_id=f"{turn}-{index}")
+        for index, (name, args) in enumerate(_MEMO_SCRIPT[turn])
+    }
+
+
+@pytest.mark.asyncio
+async def test_repeated_read_only_tool_calls_are_memoized(client, monkeypatch):
+    """Test that a run reuses read-only results until a tool writes"""
+    token = await get_auth_token(client)
+    calls = []
+
+    async def get_accounts(db, user_id):
+        calls.append("accounts")
+        return []
+
+    async def get_account(db, account_number):
+        calls.append(f"account {account_number}")
+        return None
+
+    async def deposit(db, request, user_id):
+        calls.append("deposit")
+        return type("Transaction", (), {"reference": "REF1"})()
+
+    monkeypatch.setattr(llm_agent, "get_cached_user_accounts", get_accounts)
+    monkeypatch.setattr(llm_agent, "get_cached_account_by_number", get_account)
+    monkeypatch.setattr(llm_agent, "deposit_funds", deposit)
+
+    with banking_agent.override(
+        model=FunctionModel(stream_function=_scripted_tool_calls)
+    ):
+        response = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "Deposit 10 into A1"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == 200
+    assert calls == ["accounts", "account A1", "deposit", "accounts"]
+
+
+@pytest.mark.asyncio
+async def test_conversation_history_is_replayed(client):
+    """Test that a follow-up message sees the earlier turns"""
+    token = await get_auth_token(client)
+    seen = []
+
+    def remembering_model(messages, info):
+        prompts = [
+            part.content
+            for message in messages
+            for part in message.parts
+            if isinstance(part, UserPromptPart)
+        ]
+        seen.append(prompts)
+        return ModelResponse(parts=[TextPart(f"Message {len(prompts)}")])
+
+    with banking_agent.override(model=FunctionModel(remembering_model)):
+        first = await client.post(
+            "/api/v1/agent/chat",
+            json={"message": "My name is Sam"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        conversation_id = first.json()["conversation_id"]
+        second = await client.post(
+            "/api/v1/agent/chat",
+            json={"message": "What is my name?", "conversation_id": conversation_id},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert first.json()["response"] == "Message 1"
+    assert second.json() == {
+        "response": "Message 2",
+        "conversation_id": conversation_id,
+    }
+    assert seen[-1] == ["My name is Sam", "What is my name?"]
+
+
+def _answer_only(messages, info):
+    return ModelResponse(parts=[TextPart("Hello!")])
+
+
+@pytest.mark.asyncio
+async def test_other_users_conversations_are_not_found(client):
+    """Test that a conversation can only be continued by its owner"""
+    owner_token = await get_auth_token(client)
+    with banking_agent.override(model=FunctionModel(_answer_only)):
+        response = await client.post(
+            "/api/v1/agent/chat",
+            json={"message": "Hello"},
+            headers={"Authorization": f"Bearer {owner_token}"},
+        )
+    conversation_id = response.json()["conversation_id"]
+
+    other_token = await get_auth_token(client)
+    response = await client.post(
+        "/api/v1/agent/chat/stream",
+        json={"message": "Hello", "conversation_id": conversation_id},
+        headers={"Authorization": f"Bearer {other_token}"},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_repeated_faq_is_answered_from_the_cache(client, response_cache):
+    """Test that a rephrased user-independent question skips the model"""
+    token = await get_auth_token(client)
+    calls = []
+
+    def banks_then_answer(messages, info):
+        calls.append(info)
+        if not any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            return ModelResponse(parts=[ToolCallPart("get_banks", {})])
+        return ModelResponse(parts=[TextPart("We support every bank listed.")])
+
+    with banking_agent.override(model=FunctionModel(banks_then_answer)):
+        first = await client.post(
+            "/api/v1/agent/chat",
+            json={"message": "Which banks do you support?"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        second = await client.post(
+            "/api/v1/agent/chat/stream",
+            json={"message": "Which banks do you currently support?"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert len(calls) == 2  # one run: the tool call and the answer
+    assert first.json()["response"] == "We support every bank listed."
+    events = _parse_sse(second.text)
+    assert events[0] == ("token", {"delta": "We support every bank listed."})
+    assert events[-1][0] == "done"
+    assert events[-1][1]["response"] == "We support every bank listed."
+    assert events[-1][1]["conversation_id"] != first.json()["conversation_id"]
+    assert response_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_personal_questions_bypass_the_cache(client, response_cache):
+    """Test that questions about the user's own data always reach the model"""
+    token = await get_auth_token(client)
+    calls = []
+
+    def counting_model(messages, info):
+        calls.append(info)
+        return ModelResponse(parts=[TextPart("Your balance is $0.")])
+
+    with banking_agent.override(model=FunctionModel(counting_model)):
+        for _ in range(2):
+            await client.post(
+                "/api/v1/agent/chat",
+                json={"message": "What is my balance?"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+
+    assert len(calls) == 2
+    assert response_cache.stats()["bypassed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_answers_using_user_data_are_not_cached(client, response_cache):
+    """Test that an answer built from the user's accounts is never reused"""
+    token = await get_auth_token(client)
+    await create_user_account(client, token)
+
+    with banking_agent.override(
+        model=FunctionModel(stream_function=_accounts_then_answer)
+    ):
+        for _ in range(2):
+            response = await client.post(
+                "/api/v1/agent/chat/stream",
+                json={"message": "How many accounts are there?"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert _parse_sse(response.text)[0][0] == "tool_call"
+
+    assert response_cache.stats()["entries"] == 0
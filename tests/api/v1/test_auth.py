@@ -3,6 +3,8 @@ import uuid
 import pytest
 from fastapi import status
 
+from app.core.config import settings
+from app.services.user_service import get_user_by_email, update_user_status
 from tests.helpers import (
     generate_unique_email,
     get_auth_token,
@@ -105,3 +107,114 @@ async def test_get_auth_token_helper(client):
 
     assert isinstance(token, str)
     assert len(token) > 0
+
+
+@pytest.mark.asyncio
+async def test_deactivation_applies_to_cached_principal(client, db):
+    """Test that a deactivated user is rejected even after a cached lookup"""
+    email = generate_unique_email()
+    token = await get_auth_token(client, email)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Populate the principal cache
+    assert (await client.get("/api/v1/accounts/", headers=headers)).status_code == 200
+
+    user = await get_user_by_email(db, email)
+    await update_user_status(db, user.id, False)
+
+    response = await client.get("/api/v1/accounts/", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Inactive user"
+
+
+@pytest.mark.asyncio
+async def test_email_change_invalidates_old_token(client, db):
+    """Test that a token for a changed email no longer authenticates"""
+    email = generate_unique_email()
+    token = await get_auth_token(client, email)
+    headers = {"Authorization": f"Bearer {token}"}
+    user = await get_user_by_email(db, email)
+
+    response = await client.put(
+        f"/api/v1/users/{user.id}",
+        json={"email": generate_unique_email()},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/api/v1/accounts/", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def _login_tokens(client, email: str) -> dict:
+    await register_user(client, email)
+    response = await login_user(client, email, "testpassword123")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens(client):
+    """Test that a refresh token yields a new pair and can only be used once"""
+    tokens = await _login_tokens(client, generate_unique_email())
+    assert tokens["refresh_token"]
+
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert (await client.get("/api/v1/accounts/", headers=headers)).status_code == 200
+
+    # Replaying the old token revokes the whole family, including the new one
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(client):
+    """Test that a logged out refresh token can no longer be used"""
+    tokens = await _login_tokens(client, generate_unique_email())
+
+    response = await client.post(
+        "/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_not_an_access_token(client):
+    """Test that refresh tokens are rejected by authenticated endpoints"""
+    tokens = await _login_tokens(client, generate_unique_email())
+
+    headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    response = await client.get("/api/v1/accounts/", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.skipif(not settings.REDIS_URL, reason="claims fast path needs Redis")
+@pytest.mark.asyncio
+async def test_access_token_claims_skip_user_lookup(client, monkeypatch):
+    """Test that a fresh access token authenticates without a user lookup"""
+    tokens = await _login_tokens(client, generate_unique_email())
+
+    async def fail_lookup(*args):
+        raise AssertionError("user lookup should not run")
+
+    monkeypatch.setattr("app.core.deps.get_cached_principal", fail_lookup)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert (await client.get("/api/v1/accounts/", headers=headers)).status_code == 200
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.pool import WaitTimeHistogram
+from app.db.session import engine
+from tests.helpers import get_auth_token, get_superuser_token
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path", ["/api/v1/metrics/pools", "/api/v1/metrics/agent-cache"]
+)
+async def test_metrics_require_a_superuser(client, path):
+    """Test that metrics are hidden from anonymous and regular users"""
+    response = await client.get(path)
+    assert response.status_code == 401
+
+    token = await get_auth_token(client)
+    response = await client.get(path, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_report_checkouts(client, db):
+    """Test that the pool metrics endpoint reflects app engine checkouts"""
+    token = await get_superuser_token(client, db)
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+            response = await client.get("/api/v1/metrics/pools", headers=headers)
+            assert response.status_code == 200
+            pool = response.json()["database_pool"]
+            assert pool["checked_out"] == 1
+    finally:
+        await engine.dispose()
+
+    assert pool["wait_time"]["count"] >= 1
+    assert "password_hash_pool" in response.json()
+
+
+def test_wait_time_histogram_buckets():
+    histogram = WaitTimeHistogram(buckets=(1, 10))
+    for wait_ms in (0.5, 1, 5, 50):
+        histogram.record(wait_ms)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1": 2, "le_10": 1, "le_inf": 1}
+    assert snapshot["max_ms"] == 50
+
+
+@pytest.mark.asyncio
+async def test_agent_cache_metrics(client, db):
+    """Test that the agent response cache reports its hit rate"""
+    token = await get_superuser_token(client, db)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get("/api/v1/metrics/agent-cache", headers=headers)
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"entries", "hits", "misses", "bypassed", "hit_rate"}
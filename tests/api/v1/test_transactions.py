@@ -1,12 +1,18 @@
+import json
+
 import pytest
 
+from app.services.rollup_service import rebuild_transaction_rollups
 from tests.helpers import (
     create_bank,
     create_transaction,
     create_user_account,
+    deposit,
     generate_unique_email,
     get_auth_token,
     get_transactions,
+    get_user_accounts,
+    transfer,
 )
 
 
@@ -56,3 +62,199 @@ async def test_get_transactions_with_account_filter(client):
     transactions = transactions_response.json()
     assert isinstance(transactions, list)
     assert len(transactions) >= 1
+
+
+@pytest.mark.asyncio
+async def test_transfer_funds_between_accounts(client):
+    """Test that a transfer moves funds and writes both ledger legs"""
+    token = await get_auth_token(client, generate_unique_email())
+    await create_bank(client, token)
+    source = (await create_user_account(client, token)).json()
+    target = (await create_user_account(client, token, "savings")).json()
+    await deposit(client, token, source["account_number"], 100.0)
+
+    response = await transfer(
+        client, token, source["account_number"], target["account_number"], 40.0
+    )
+    assert response.status_code == 200
+    details = response.json()["details"]
+    assert details["new_balance"] == 60.0
+
+    balances = {
+        acc["account_number"]: acc["balance"]
+        for acc in (await get_user_accounts(client, token)).json()
+    }
+    assert balances[source["account_number"]] == 60.0
+    assert balances[target["account_number"]] == 40.0
+
+    legs = (await get_transactions(client, token, account_id=target["id"])).json()
+    assert [tx["transfer_id"] for tx in legs] == [details["transfer_id"]]
+
+
+@pytest.mark.asyncio
+async def test_transfer_insufficient_funds_leaves_balances_untouched(client):
+    """Test that a rejected transfer does not partially apply"""
+    token = await get_auth_token(client, generate_unique_email())
+    await create_bank(client, token)
+    source = (await create_user_account(client, token)).json()
+    target = (await create_user_account(client, token, "savings")).json()
+    await deposit(client, token, source["account_number"], 10.0)
+
+    response = await transfer(
+        client, token, source["account_number"], target["account_number"], 50.0
+    )
+    assert response.status_code == 400
+
+    balances = {
+        acc["account_number"]: acc["balance"]
+        for acc in (await get_user_accounts(client, token)).json()
+    }
+    assert balances[source["account_number"]] == 10.0
+    assert balances[target["account_number"]] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_batch_transfer_is_all_or_nothing(client):
+    """Test batch transfers apply together and reject together"""
+    token = await get_auth_token(client, generate_unique_email())
+    headers = {"Authorization": f"Bearer {token}"}
+    await create_bank(client, token)
+    source = (await create_user_account(client, token)).json()["account_number"]
+    target = (await create_user_account(client, token, "savings")).json()[
+        "account_number"
+    ]
+    await deposit(client, token, source, 100.0)
+
+    item = {"from_account_number": source, "to_account_number": target}
+    response = await client.post(
+        "/api/v1/transactions/transfers/batch",
+        json={"transfers": [{**item, "amount": 30.0}, {**item, "amount": 20.0}]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+    assert response.json()["total_amount"] == 50.0
+
+    # Second item overdraws the account, so nothing in the batch is applied
+    response = await client.post(
+        "/api/v1/transactions/transfers/batch",
+        json={"transfers": [{**item, "amount": 30.0}, {**item, "amount": 30.0}]},
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Transfer 1 failed")
+
+    balances = {
+        acc["account_number"]: acc["balance"]
+        for acc in (await get_user_accounts(client, token)).json()
+    }
+    assert balances == {source: 50.0, target: 50.0}
+
+
+@pytest.mark.asyncio
+async def test_transaction_summary_aggregates_by_type(client):
+    """Test the account summary totals and status filter"""
+    token = await get_auth_token(client, generate_unique_email())
+    headers = {"Authorization": f"Bearer {token}"}
+    await create_bank(client, token)
+    account = (await create_user_account(client, token)).json()
+    await deposit(client, token, account["account_number"], 100.0)
+    await deposit(client, token, account["account_number"], 50.0)
+    await client.post(
+        "/api/v1/transactions/withdraw",
+        json={"account_number": account["account_number"], "amount": 30.0},
+        headers=headers,
+    )
+
+    response = await client.get(
+        f"/api/v1/transactions/summary/{account['id']}", headers=headers
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["total_deposits"] == 150.0
+    assert summary["total_withdrawals"] == 30.0
+    assert summary["net_flow"] == 120.0
+
+    response = await client.get(
+        f"/api/v1/transactions/summary/{account['id']}?status=pending",
+        headers=headers,
+    )
+    assert response.json()["net_flow"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rollup_rebuild_matches_incremental_totals(client, db):
+    """Test that rebuilding rollups reproduces the incrementally kept totals"""
+    token = await get_auth_token(client, generate_unique_email())
+    headers = {"Authorization": f"Bearer {token}"}
+    await create_bank(client, token)
+    source = (await create_user_account(client, token)).json()
+    target = (await create_user_account(client, token, "savings")).json()
+    await deposit(client, token, source["account_number"], 80.0)
+    await transfer(
+        client, token, source["account_number"], target["account_number"], 25.0
+    )
+
+    url = f"/api/v1/transactions/summary/{source['id']}"
+    incremental = (await client.get(url, headers=headers)).json()
+    assert incremental["total_deposits"] == 80.0
+    assert incremental["total_transfers"] == 25.0
+
+    await rebuild_transaction_rollups(db, batch_size=1)
+    assert (await client.get(url, headers=headers)).json() == incremental
+
+
+@pytest.mark.asyncio
+async def test_transactions_cursor_pagination(client):
+    """Test walking the full history with the X-Next-Cursor header"""
+    token = await get_auth_token(client, generate_unique_email())
+    headers = {"Authorization": f"Bearer {token}"}
+    await create_bank(client, token)
+    account = (await create_user_account(client, token)).json()
+    for amount in (10.0, 20.0, 30.0):
+        await deposit(client, token, account["account_number"], amount)
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(
+            "/api/v1/transactions/", params=params, headers=headers
+        )
+        assert response.status_code == 200
+        seen.extend(tx["amount"] for tx in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    assert seen == [30.0, 20.0, 10.0]
+
+    response = await client.get(
+        "/api/v1/transactions/", params={"cursor": "not-a-cursor"}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_transactions_csv_and_ndjson(client):
+    """Test streaming the full history in both export formats"""
+    token = await get_auth_token(client, generate_unique_email())
+    headers = {"Authorization": f"Bearer {token}"}
+    await create_bank(client, token)
+    account = (await create_user_account(client, token)).json()
+    await deposit(client, token, account["account_number"], 10.0)
+    await deposit(client, token, account["account_number"], 20.0)
+
+    response = await client.get("/api/v1/transactions/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("id,reference,account_id")
+    assert len(lines) == 3
+
+    response = await client.get(
+        "/api/v1/transactions/export", params={"format": "ndjson"}, headers=headers
+    )
+    rows = [json.loads(line) for line in response.text.strip().splitlines()]
+    assert [row["amount"] for row in rows] == [20.0, 10.0]
+    assert rows[0]["transaction_type"] == "deposit"
@@ -20,6 +20,7 @@ patcher.start()  # globally patch for all tests
 # ------------------------
 # IMPORT APP AFTER MOCKING
 # ------------------------
+from app.core.cache import cache
 from app.core.config import settings
 from app.db.models.base import Base
 from app.db.session import get_db
@@ -102,6 +103,22 @@ async def client(db):
     app.dependency_overrides.clear()
 
 
+# ------------------------
+# REDIS CACHE (ONLY WHEN TEST_REDIS_URL IS SET)
+# ------------------------
+@pytest_asyncio.fixture(autouse=True)
+async def redis_cache():
+    """Start every test with an empty cache; a no-op without Redis."""
+    if not settings.REDIS_URL:
+        yield None
+        return
+
+    await cache.init_cache()
+    await cache.redis.flushdb()
+    yield cache
+    await cache.close()
+
+
 @pytest.fixture(autouse=True)
 def mock_deepseek_provider():
     with patch(
@@ -1,6 +1,10 @@
 import uuid
 
 from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.user import User
 
 
 def generate_unique_email():
@@ -51,6 +55,18 @@ async def get_auth_token(client: AsyncClient, email: str = None) -> str:
     return token_data["access_token"]
 
 
+async def get_superuser_token(client: AsyncClient, db: AsyncSession) -> str:
+    """Register a user, promote them to superuser and return their auth token"""
+    email = generate_unique_email()
+    await register_user(client, email, "testpassword123")
+    await db.execute(update(User).filter(User.email == email).values(is_superuser=True))
+    await db.commit()
+
+    # Log in after the promotion so the token carries the superuser claim
+    login_response = await login_user(client, email, "testpassword123")
+    return login_response.json()["access_token"]
+
+
 async def create_bank(client: AsyncClient, token: str, bank_data: dict = None) -> dict:
     """Create a bank (financial institution)"""
     if bank_data is None:
@@ -180,3 +196,35 @@ async def get_cards(client: AsyncClient, token: str, account_id: int = None) ->
 
     response = await client.get(url, headers={"Authorization": f"Bearer {token}"})
     return response
+
+
+async def deposit(
+    client: AsyncClient, token: str, account_number: str, amount: float = 100.0
+) -> dict:
+    """Deposit funds into an account"""
+    response = await client.post(
+        "/api/v1/transactions/deposit",
+        json={"account_number": account_number, "amount": amount},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response
+
+
+async def transfer(
+    client: AsyncClient,
+    token: str,
+    from_account_number: str,
+    to_account_number: str,
+    amount: float,
+) -> dict:
+    """Transfer funds between two accounts"""
+    response = await client.post(
+        "/api/v1/transactions/transfer",
+        json={
+            "from_account_number": from_account_number,
+            "to_account_number": to_account_number,
+            "amount": amount,
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response
@@ -0,0 +1,217 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.cache import LocalCache, RedisCache
+from app.core.config import settings
+from app.services import account_service
+
+requires_redis = pytest.mark.skipif(
+    not settings.REDIS_URL, reason="set TEST_REDIS_URL to run Redis cache tests"
+)
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, ttl=60)
+    local.set("a", "1")
+    local.set("b", "2")
+    local.get("a")  # "b" is now the least recently used
+    local.set("c", "3")
+
+    assert local.get("a") == "1"
+    assert local.get("b") is None
+    assert local.get("c") == "3"
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    local = LocalCache(max_entries=10, ttl=60)
+    local.set("a", "1", expire=5)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert local.get("a") is None
+
+
+@requires_redis
+@pytest.mark.asyncio
+async def test_delete_evicts_local_copy_in_other_workers(redis_cache):
+    other_worker = RedisCache()
+    await other_worker.init_cache()
+    try:
+        await redis_cache.set("banks:test", b"cached")
+        assert await other_worker.get("banks:test", local=True) == b"cached"
+
+        await redis_cache.delete("banks:test")
+
+        # The invalidation arrives asynchronously over pub/sub
+        for _ in range(50):
+            if other_worker.local.get("banks:test") is None:
+                break
+            await asyncio.sleep(0.01)
+        assert other_worker.local.get("banks:test") is None
+        assert await other_worker.get("banks:test", local=True) is None
+    finally:
+        await other_worker.close()
+
+
+@requires_redis
+@pytest.mark.asyncio
+async def test_malformed_invalidation_does_not_stop_listener(redis_cache):
+    other_worker = RedisCache()
+    await other_worker.init_cache()
+    try:
+        await redis_cache.set("banks:test", b"cached")
+        assert await other_worker.get("banks:test", local=True) == b"cached"
+
+        channel = settings.CACHE_INVALIDATION_CHANNEL
+        await redis_cache.redis.publish(channel, "not json")
+        await redis_cache.redis.publish(channel, '{"keys": ["banks:test"]}')
+        await redis_cache.delete("banks:test")
+
+        for _ in range(50):
+            if other_worker.local.get("banks:test") is None:
+                break
+            await asyncio.sleep(0.01)
+        assert other_worker.local.get("banks:test") is None
+        assert not other_worker._listener.done()
+    finally:
+        await other_worker.close()
+
+
+@pytest.mark.asyncio
+async def test_exists_treats_redis_errors_as_missing():
+    class FailingRedis:
+        async def exists(self, key):
+            raise redis.ConnectionError("connection refused")
+
+    broken = RedisCache()
+    broken.redis = FailingRedis()
+    assert await broken.exists("banks:test") is False
+
+
+@requires_redis
+@pytest.mark.asyncio
+async def test_clear_pattern_deletes_in_batches(redis_cache):
+    for i in range(25):
+        await redis_cache.set(f"report:{i}", b"x")
+    await redis_cache.set("other", b"kept")
+
+    assert await redis_cache.clear_pattern("report:*", batch_size=10) == 25
+    assert await redis_cache.get("report:3") is None
+    assert await redis_cache.get("other") == b"kept"
+
+
+@requires_redis
+@pytest.mark.asyncio
+async def test_invalidate_namespace_hides_previous_generation(redis_cache):
+    await redis_cache.set_value("accounts", [1], namespace="user:1")
+    await redis_cache.set_value("accounts", [2], namespace="user:2")
+
+    await redis_cache.invalidate_namespace("user:1")
+
+    assert await redis_cache.get_value("accounts", namespace="user:1") is None
+    assert await redis_cache.get_value("accounts", namespace="user:2") == [2]
+
+
+@requires_redis
+@pytest.mark.asyncio
+async def test_account_load_racing_invalidation_is_not_served(
+    redis_cache, db, monkeypatch
+):
+    balances = [100.0, 50.0]
+    loading, invalidated = asyncio.Event(), asyncio.Event()
+
+    async def get_account(db, account_number):
+        balance = balances.pop(0)
+        if balance == 100.0:  # the stale read finishes after the invalidation
+            loading.set()
+            await invalidated.wait()
+        return {
+            "id": 1,
+            "user_id": 1,
+            "bank_id": 1,
+            "account_number": account_number,
+            "account_type": "checking",
+            "balance": balance,
+            "available_balance": balance,
+            "currency": "USD",
+            "status": "active",
+            "created_at": "2025-01-01T00:00:00",
+        }
+
+    monkeypatch.setattr(account_service, "get_account_by_number", get_account)
+    stale = asyncio.create_task(
+        account_service.get_cached_account_by_number(db, "ACC1")
+    )
+    await loading.wait()
+    await account_service.invalidate_account_cache(
+        [SimpleNamespace(account_number="ACC1", user_id=1)]
+    )
+    invalidated.set()
+    assert (await stale).balance == 100.0
+
+    fresh = await account_service.get_cached_account_by_number(db, "ACC1")
+    assert fresh.balance == 50.0
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_coalesces_concurrent_misses(redis_cache):
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return ["bank"]
+
+    single_flight = redis_cache or RedisCache()
+    results = await asyncio.gather(
+        *(single_flight.get_or_load("banks:coalesce", load) for _ in range(10))
+    )
+
+    assert calls == 1
+    assert results == [["bank"]] * 10
+
+
+@requires_redis
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "stored",
+    [b"\x00\x01", b"\x00" * 16 + b"\xc1garbage"],
+    ids=["truncated", "other-codec"],
+)
+async def test_get_or_load_reloads_undecodable_entries(redis_cache, stored):
+    async def load():
+        return ["bank"]
+
+    await redis_cache.set("banks:corrupt", stored)
+
+    assert await redis_cache.get_or_load("banks:corrupt", load) == ["bank"]
+    # The loader's value replaced the bad entry
+    assert await redis_cache.get_or_load("banks:corrupt", load) == ["bank"]
+    assert await redis_cache.get("banks:corrupt") != stored
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_shares_loader_errors():
+    async def load():
+        await asyncio.sleep(0.01)
+        raise ValueError("database down")
+
+    single_flight = RedisCache()
+    results = await asyncio.gather(
+        *(single_flight.get_or_load("banks:error", load) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not single_flight._inflight
+
+
+def test_early_refresh_only_near_expiry():
+    now = time.time()
+    assert not RedisCache._should_refresh_early(0.01, now + 300)
+    assert RedisCache._should_refresh_early(0.01, now - 1)
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.cache_codec import CompressedCodec, JsonCodec, MsgpackCodec, get_codec
+from app.schemas.account import AccountResponse
+
+
+def _accounts(count: int = 3) -> list[AccountResponse]:
+    return [
+        AccountResponse(
+            id=i,
+            user_id=1,
+            bank_id=1,
+            bank_name="Test Bank",
+            bank_code="TB1",
+            account_number=f"ACC{i:012d}",
+            account_type="checking",
+            balance=100.5 * i,
+            available_balance=100.5 * i,
+            currency="USD",
+            status="active",
+            created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+def test_codec_round_trips_pydantic_models(name):
+    if name == "msgpack":
+        pytest.importorskip("msgpack")
+    codec = get_codec(name)
+    accounts = _accounts()
+
+    data = codec.encode(accounts)
+
+    assert codec.decode(data, list[AccountResponse]) == accounts
+    assert codec.decode(data)[0]["account_number"] == accounts[0].account_number
+
+
+def test_compressed_codec_only_compresses_large_values():
+    codec = CompressedCodec(JsonCodec(), min_size=512)
+
+    small = codec.encode(_accounts(1))
+    large = codec.encode(_accounts(50))
+
+    assert small[:1] == CompressedCodec._RAW
+    assert large[:1] == CompressedCodec._ZLIB
+    assert len(large) < len(JsonCodec().encode(_accounts(50)))
+    assert codec.decode(large, list[AccountResponse]) == _accounts(50)
+
+    # Entries stay readable after the threshold changes
+    assert CompressedCodec(JsonCodec(), min_size=0).decode(large) is not None
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        get_codec("pickle")
+
+
+def test_msgpack_codec_requires_msgpack(monkeypatch):
+    monkeypatch.setattr("app.core.cache_codec.msgpack", None)
+    with pytest.raises(RuntimeError):
+        MsgpackCodec()
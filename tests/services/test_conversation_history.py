@@ -0,0 +1,110 @@
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from app.services.conversation_service import (
+    SUMMARY_HEADER,
+    estimate_tokens,
+    trim_history,
+)
+
+
+def _turn(question: str, tool_output: str = "ok") -> list:
+    """One user turn that calls a tool before answering"""
+    return [
+        ModelRequest(parts=[UserPromptPart(question)], instructions="Be helpful"),
+        ModelResponse(parts=[ToolCallPart("get_user_accounts", {}, "call")]),
+        ModelRequest(parts=[ToolReturnPart("get_user_accounts", tool_output, "call")]),
+        ModelResponse(parts=[TextPart(f"Answer to {question}")]),
+    ]
+
+
+def _user_prompts(messages) -> list[str]:
+    return [
+        part.content
+        for message in messages
+        for part in message.parts
+        if isinstance(part, UserPromptPart)
+    ]
+
+
+def test_short_history_is_kept_without_instructions():
+    messages = _turn("first") + _turn("second")
+
+    trimmed = trim_history(messages, max_tokens=10_000, tool_output_chars=1000)
+
+    assert _user_prompts(trimmed) == ["first", "second"]
+    assert all(
+        message.instructions is None
+        for message in trimmed
+        if isinstance(message, ModelRequest)
+    )
+
+
+def test_only_earlier_tool_outputs_are_truncated():
+    messages = _turn("first", "x" * 500) + _turn("second", "y" * 500)
+
+    trimmed = trim_history(messages, max_tokens=10_000, tool_output_chars=100)
+
+    outputs = [
+        part.content
+        for message in trimmed
+        for part in message.parts
+        if isinstance(part, ToolReturnPart)
+    ]
+    assert outputs[0].endswith("[truncated]") and len(outputs[0]) < 150
+    assert outputs[1] == "y" * 500
+
+
+def test_old_turns_are_evicted_into_a_summary():
+    messages = sum((_turn(f"question {i}", "z" * 200) for i in range(20)), [])
+
+    trimmed = trim_history(messages, max_tokens=600, tool_output_chars=50)
+
+    assert estimate_tokens(trimmed) <= 600 + 100  # plus the summary
+    assert _user_prompts(trimmed)[-1] == "question 19"
+    assert "question 0" not in _user_prompts(trimmed)
+
+    summary = trimmed[0].parts[0]
+    assert isinstance(summary, SystemPromptPart)
+    assert summary.content.startswith(SUMMARY_HEADER)
+    assert "- question 18" not in summary.content  # still in the history
+    assert f"- question {19 - len(_user_prompts(trimmed))}" in summary.content
+
+
+def test_summary_rolls_forward_as_more_turns_are_evicted():
+    history = trim_history(
+        sum((_turn(f"question {i}") for i in range(6)), []),
+        max_tokens=150,
+        tool_output_chars=50,
+    )
+    history = trim_history(
+        history + _turn("question 6") + _turn("question 7"),
+        max_tokens=150,
+        tool_output_chars=50,
+    )
+
+    summaries = [
+        part
+        for message in history
+        for part in message.parts
+        if isinstance(part, SystemPromptPart)
+    ]
+    assert len(summaries) == 1
+    assert "- question 0" in summaries[0].content
+    assert _user_prompts(history)[-1] == "question 7"
+
+
+def test_latest_turn_is_kept_even_over_budget():
+    messages = _turn("first") + _turn("huge", "h" * 5000)
+
+    trimmed = trim_history(messages, max_tokens=10, tool_output_chars=100)
+
+    assert _user_prompts(trimmed) == ["huge"]
+    assert trimmed[2].parts[0].content == "h" * 5000
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.models.bank import Bank
+from app.db.models.user import User
+from app.db.session import LazySession, _connect_args, build_engine
+
+
+def test_pgbouncer_mode_disables_prepared_statement_caches():
+    config = settings.model_copy(update={"DB_PGBOUNCER": True})
+
+    connect_args = _connect_args(config)
+
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["statement_cache_size"] == 0
+    names = {connect_args["prepared_statement_name_func"]() for _ in range(3)}
+    assert len(names) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pgbouncer", [False, True])
+async def test_repeated_queries_run_in_each_mode(pgbouncer):
+    engine = build_engine(settings.model_copy(update={"DB_PGBOUNCER": pgbouncer}))
+    try:
+        async with engine.connect() as conn:
+            for email in ("a@example.com", "b@example.com", "a@example.com"):
+                result = await conn.execute(select(User.id).filter(User.email == email))
+                assert result.scalar_one_or_none() is None
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def lazy_session_factory(engine):
+    return async_sessionmaker(
+        engine, class_=LazySession, expire_on_commit=False, autoflush=False
+    )
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_returns_connection_after_each_read(
+    engine, lazy_session_factory
+):
+    async with lazy_session_factory() as db:
+        assert engine.pool.checkedout() == 0
+
+        bank = Bank(name="Lazy Bank", code="LAZY01", country="US")
+        db.add(bank)
+        await db.flush()
+        assert engine.pool.checkedout() == 1  # uncommitted write keeps it
+        await db.commit()
+        assert engine.pool.checkedout() == 0
+
+        loaded = await db.scalar(select(Bank).filter(Bank.code == "LAZY01"))
+        assert engine.pool.checkedout() == 0
+        assert loaded.name == "Lazy Bank"  # still loaded after the release
+
+        await db.delete(loaded)
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_release_between_reads_can_be_turned_on_per_session(
+    engine, lazy_session_factory
+):
+    async with lazy_session_factory(release_when_idle=False) as db:
+        await db.execute(select(User.id))
+        assert engine.pool.checkedout() == 1  # kept until the session closes
+
+        await db.release_between_reads()
+        assert engine.pool.checkedout() == 0
+        await db.execute(select(User.id))
+        assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_keeps_connection_while_holding_row_locks(
+    engine, lazy_session_factory
+):
+    async with lazy_session_factory() as db:
+        await db.execute(select(User).with_for_update())
+        assert engine.pool.checkedout() == 1
+
+        await db.rollback()
+        assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.asyncio
+async def test_lazy_sessions_share_a_small_pool(engine):
+    small_engine = create_async_engine(
+        settings.DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.5
+    )
+    session_factory = async_sessionmaker(
+        small_engine, class_=LazySession, expire_on_commit=False
+    )
+
+    async def slow_request():
+        async with session_factory() as db:
+            await db.execute(select(User.id))
+            await asyncio.sleep(0.2)  # e.g. waiting on the LLM or a stream
+            await db.execute(select(User.id))
+
+    try:
+        # Holding connections across the sleep, later requests would time out
+        await asyncio.wait_for(
+            asyncio.gather(*(slow_request() for _ in range(10))), timeout=5
+        )
+    finally:
+        await small_engine.dispose()
@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import JWTKeys, VerifiedTokenCache, create_access_token
+from app.services import token_service
+from app.services.token_service import MemoryRefreshTokenStore
+
+
+def _pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private_pem, public_pem
+
+
+@pytest.fixture
+def fresh_token_cache(monkeypatch):
+    monkeypatch.setattr(security, "verified_tokens", VerifiedTokenCache(16))
+
+
+def test_verify_token_reuses_cached_verification(fresh_token_cache, monkeypatch):
+    token = create_access_token({"sub": "cached@example.com", "uid": 1})
+    assert security.verify_token(token).user_id == 1
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("token should be served from the cache")
+
+    monkeypatch.setattr(security.jwt_keys, "decode", fail_decode)
+    assert security.verify_token(token).email == "cached@example.com"
+
+
+def test_cached_token_is_rejected_after_expiry(fresh_token_cache):
+    token = create_access_token(
+        {"sub": "expiring@example.com"}, expires_delta=timedelta(seconds=1)
+    )
+    security.verify_token(token)
+
+    time.sleep(1.1)
+    with pytest.raises(HTTPException) as exc_info:
+        security.verify_token(token)
+    assert exc_info.value.detail == "Token has expired"
+
+
+def test_verified_token_cache_is_bounded():
+    cache = VerifiedTokenCache(max_entries=2)
+    expires_at = time.time() + 60
+    for token in ("a", "b", "c"):
+        cache.set(token, expires_at, security.TokenData(email="x@example.com"))
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.parametrize(
+    "algorithm, private_key",
+    [
+        ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    ],
+)
+def test_asymmetric_keys_sign_and_publish_jwks(algorithm, private_key):
+    private_pem, public_pem = _pem_pair(private_key)
+    signer = JWTKeys(algorithm, private_key=private_pem, key_id="key-1")
+    # Another service only needs the public key
+    verifier = JWTKeys(algorithm, public_key=public_pem)
+
+    token = signer.encode({"sub": "user@example.com"})
+
+    assert jwt.get_unverified_header(token)["kid"] == "key-1"
+    assert verifier.decode(token)["sub"] == "user@example.com"
+    with pytest.raises(RuntimeError):
+        verifier.encode({"sub": "user@example.com"})
+
+    jwks = signer.jwks()["keys"]
+    assert jwks[0]["kid"] == "key-1"
+    assert jwks[0]["alg"] == algorithm
+    assert "d" not in jwks[0]  # never publish the private part
+
+
+def test_symmetric_keys_publish_no_jwks():
+    assert JWTKeys("HS256", secret="secret").jwks() == {"keys": []}
+
+
+@pytest.mark.asyncio
+async def test_memory_refresh_token_store_evicts_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(token_service.time, "monotonic", lambda: now[0])
+    store = MemoryRefreshTokenStore()
+    await store.save("a1", user_id=1, family="a", ttl=60)
+    await store.save("b1", user_id=1, family="b", ttl=600)
+    assert await store.consume("a1") == (1, "a")
+    await store.save("a2", user_id=1, family="a", ttl=60)
+
+    now[0] += 61
+    assert await store.consume("a2") is None
+    assert set(store._families) == {"b"}
+    assert store._user_families == {1: {"b"}}
+
+    await store.revoke_family("b")
+    assert (store._tokens, store._families, store._user_families) == ({}, {}, {})
+
+
+def test_warns_when_workers_share_no_refresh_token_store(monkeypatch):
+    warnings = []
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setattr(token_service.cache, "redis", None)
+    monkeypatch.setattr(
+        token_service.logfire, "warn", lambda msg, **kw: warnings.append(kw)
+    )
+
+    token_service.warn_if_refresh_tokens_per_worker()
+
+    assert warnings == [{"workers": 4}]
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import (
+    PasswordHashPool,
+    get_password_hash_async,
+    verify_password_async,
+)
+
+
+async def _max_loop_stall(task) -> float:
+    """Longest gap between event loop ticks while ``task`` runs"""
+    longest = 0.0
+    last = time.monotonic()
+    while not task.done():
+        await asyncio.sleep(0.005)
+        now = time.monotonic()
+        longest = max(longest, now - last)
+        last = now
+    return longest
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_does_not_block_event_loop():
+    started = time.monotonic()
+    hashing = asyncio.ensure_future(
+        asyncio.gather(*(get_password_hash_async("password123") for _ in range(4)))
+    )
+
+    stall = await _max_loop_stall(hashing)
+    hashes = await hashing
+    elapsed = time.monotonic() - started
+
+    assert await verify_password_async("password123", hashes[0])
+    assert not await verify_password_async("wrong-password", hashes[0])
+    # Each bcrypt call takes far longer than this when run inline
+    assert stall < min(0.1, elapsed / 2)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_rejects_when_queue_is_full():
+    pool = PasswordHashPool("thread", workers=1, max_pending=1)
+    try:
+        results = await asyncio.gather(
+            *(pool.run(time.sleep, 0.05) for _ in range(3)), return_exceptions=True
+        )
+    finally:
+        pool.shutdown()
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert pool.stats()["completed"] == 2
+    assert pool.stats()["peak_queue_depth"] == 1
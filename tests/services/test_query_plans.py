@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.db.models.account import Account
+from app.schemas.transaction import TransactionQuery
+from app.services.account_service import get_all_accounts
+from app.services.bank_service import get_all_active_banks
+from app.services.card_service import get_card_transactions, get_user_cards
+from app.services.rollup_service import get_rollup_totals
+from app.services.transaction_service import (
+    get_transactions,
+    get_user_all_transactions,
+)
+from tests.helpers import (
+    create_bank,
+    create_card,
+    create_user_account,
+    deposit,
+    generate_unique_email,
+    get_auth_token,
+)
+
+
+def _scan_nodes(plan: dict):
+    """Yield (node type, relation) for every node in an EXPLAIN JSON plan"""
+    yield plan["Node Type"], plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from _scan_nodes(child)
+
+
+async def _explain(db, call):
+    """Run a service call, then EXPLAIN every statement it executed"""
+    statements = []
+    execute = db.execute
+
+    async def recording_execute(statement, *args, **kwargs):
+        statements.append(statement)
+        return await execute(statement, *args, **kwargs)
+
+    db.execute = recording_execute
+    try:
+        await call()
+    finally:
+        db.execute = execute
+
+    # Tables are tiny in tests, so forbid sequential scans to see which
+    # indexes the planner can use at production sizes
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    nodes = []
+    for statement in statements:
+        sql = statement.compile(
+            dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar_one()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        nodes.extend(_scan_nodes(plan[0]["Plan"]))
+    return nodes
+
+
+@pytest.mark.asyncio
+async def test_service_queries_use_index_scans(client, db):
+    """Test that hot service queries are served by indexes, not seq scans"""
+    token = await get_auth_token(client, generate_unique_email())
+    await create_bank(client, token)
+    account = (await create_user_account(client, token)).json()
+    card = (await create_card(client, token, account["id"])).json()
+    await deposit(client, token, account["account_number"], 25.0)
+    user_id = (await db.get(Account, account["id"])).user_id
+
+    calls = {
+        "get_transactions": lambda: get_transactions(
+            db, TransactionQuery(account_id=account["id"])
+        ),
+        "get_user_all_transactions": lambda: get_user_all_transactions(db, user_id),
+        "get_card_transactions": lambda: get_card_transactions(db, card["id"], user_id),
+        "get_user_cards": lambda: get_user_cards(db, user_id),
+        "get_all_accounts": lambda: get_all_accounts(db, user_id),
+        "get_all_active_banks": lambda: get_all_active_banks(db),
+        "get_rollup_totals": lambda: get_rollup_totals(db, account["id"]),
+    }
+
+    for name, call in calls.items():
+        nodes = await _explain(db, call)
+        seq_scans = [relation for node, relation in nodes if node == "Seq Scan"]
+        assert not seq_scans, f"{name} sequentially scans {seq_scans}"
@@ -0,0 +1,111 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.db.models.bank import Bank
+from app.db.session import (
+    LazySession,
+    build_engine,
+    fork_session,
+    use_replica,
+)
+from app.services.account_service import (
+    get_cached_account_by_number,
+    get_cached_user_accounts,
+)
+from app.services.bank_service import get_all_active_banks, get_cached_active_banks
+from app.services.card_service import get_user_cards
+
+
+@pytest.fixture
+def replica_statements():
+    return []
+
+
+@pytest_asyncio.fixture
+async def replica(engine, replica_statements):
+    # A second engine on the test database stands in for the replica
+    replica = build_engine(url=settings.DATABASE_URL)
+
+    @event.listens_for(replica.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        replica_statements.append(statement)
+
+    yield replica
+    await replica.dispose()
+
+
+@pytest_asyncio.fixture
+async def routed_db(engine, replica):
+    session_factory = async_sessionmaker(
+        engine,
+        class_=LazySession,
+        replica_bind=replica,
+        expire_on_commit=False,
+    )
+    async with session_factory() as session:
+        yield session
+        await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_only_marked_reads_use_the_replica(
+    routed_db, engine, replica, replica_statements
+):
+    assert routed_db.sync_session.get_bind() is engine.sync_engine
+    with use_replica(routed_db):
+        assert routed_db.sync_session.get_bind() is replica.sync_engine
+
+    await get_user_cards(routed_db, user_id=0)
+    assert any("FROM cards" in statement for statement in replica_statements)
+
+
+@pytest.mark.asyncio
+async def test_cache_loaders_read_from_the_primary(routed_db, replica_statements):
+    # Loaders refill the cache right after an invalidation; a lagging
+    # replica would put the old rows back for the whole TTL
+    with use_replica(routed_db):
+        await get_cached_active_banks(routed_db)
+        await get_cached_user_accounts(routed_db, user_id=0)
+        await get_cached_account_by_number(routed_db, "ACC0")
+
+    assert replica_statements == []
+
+
+@pytest.mark.asyncio
+async def test_locking_reads_stay_on_the_primary(routed_db, engine):
+    with use_replica(routed_db):
+        bind = routed_db.sync_session.get_bind(clause=select(Bank).with_for_update())
+    assert bind is engine.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_session_sticks_to_the_primary_after_a_write(
+    routed_db, replica_statements
+):
+    routed_db.add(Bank(name="Sticky Bank", code="STICKY01", country="US"))
+    await routed_db.flush()
+    replica_statements.clear()
+
+    with use_replica(routed_db):
+        banks = await get_all_active_banks(routed_db)
+
+    # The replica could lag; the new bank is only guaranteed on the primary
+    assert "STICKY01" in {bank.code for bank in banks}
+    assert replica_statements == []
+
+
+@pytest.mark.asyncio
+async def test_forked_session_keeps_read_your_writes(routed_db, engine, replica):
+    async with fork_session(routed_db) as fresh:
+        with use_replica(fresh):
+            assert fresh.sync_session.get_bind() is replica.sync_engine
+
+    routed_db.add(Bank(name="Forked Bank", code="FORK01", country="US"))
+    await routed_db.flush()
+
+    async with fork_session(routed_db) as after_write:
+        with use_replica(after_write):
+            assert after_write.sync_session.get_bind() is engine.sync_engine
@@ -0,0 +1,115 @@
+import pytest
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.services.response_cache import ResponseCache, is_user_independent
+
+requires_redis = pytest.mark.skipif(
+    not settings.REDIS_URL, reason="set TEST_REDIS_URL to run Redis cache tests"
+)
+
+
+@pytest.fixture
+def without_redis(monkeypatch):
+    """Only this worker's index; no exact-match copies shared through Redis"""
+    monkeypatch.setattr(cache, "redis", None)
+
+
+def test_only_user_independent_questions_qualify():
+    assert is_user_independent("Which banks do you support?")
+    assert is_user_independent("How are funds transferred between accounts?")
+    assert not is_user_independent("Transfer funds between accounts")
+    assert not is_user_independent("What is my balance?")
+    assert not is_user_independent("Show me my cards")
+    assert not is_user_independent("How do I send 50 to account 1234?")
+    assert not is_user_independent("How much money do I have?")
+    assert not is_user_independent("What did I spend on groceries?")
+    assert not is_user_independent("Where am I overspending?")
+    assert not is_user_independent("Can we open a joint account?")
+    assert not is_user_independent("Which card is best if I'd like to travel?")
+    assert not is_user_independent("How long until I'll get paid?")
+    assert not is_user_independent("   ")
+
+
+@pytest.mark.asyncio
+async def test_similar_questions_share_an_answer(without_redis):
+    cache = ResponseCache(max_entries=10, ttl=60, threshold=0.85)
+    await cache.store("Which banks do you support?", "Bank A and Bank B")
+
+    assert await cache.lookup("Which banks do you support") == "Bank A and Bank B"
+    assert await cache.lookup("Which BANKS do you currently support?") == (
+        "Bank A and Bank B"
+    )
+    assert await cache.lookup("What banks are supported?") is None
+    assert await cache.lookup("How are accounts opened?") is None
+    assert await cache.lookup("Which of my banks?") is None
+
+    assert cache.stats() == {
+        "entries": 1,
+        "hits": 2,
+        "misses": 2,
+        "bypassed": 1,
+        "hit_rate": 0.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_requests_to_act_never_get_a_cached_answer(without_redis):
+    cache = ResponseCache(max_entries=10, ttl=60, threshold=0.85)
+    await cache.store("How are funds transferred between accounts?", "Use a transfer")
+
+    assert await cache.lookup("Transfer funds between accounts") is None
+    assert await cache.lookup("Could you transfer funds between accounts?") is None
+
+
+@pytest.mark.asyncio
+async def test_personal_answers_are_never_stored(without_redis):
+    cache = ResponseCache(max_entries=10, ttl=60, threshold=0.85)
+    await cache.store("What is my balance?", "$100")
+
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_are_evicted(without_redis, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.response_cache.time.monotonic", lambda: clock[0])
+    cache = ResponseCache(max_entries=2, ttl=60, threshold=0.85)
+
+    await cache.store("Which banks do you support?", "Bank A")
+    await cache.store("How do transfers work?", "Instantly")
+    await cache.store("What are the opening hours?", "Always open")
+    assert await cache.lookup("Which banks do you support?") is None
+    assert await cache.lookup("How do transfers work?") == "Instantly"
+
+    clock[0] += 61
+    assert await cache.lookup("How do transfers work?") is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_every_answer(without_redis):
+    cache = ResponseCache(max_entries=10, ttl=60, threshold=0.85)
+    await cache.store("Which banks do you support?", "Bank A")
+
+    await cache.invalidate()
+
+    assert await cache.lookup("Which banks do you support?") is None
+
+
+@requires_redis
+@pytest.mark.asyncio
+async def test_exact_repeats_are_shared_between_workers(redis_cache):
+    worker, other_worker = (
+        ResponseCache(max_entries=1, ttl=60, threshold=0.85) for _ in range(2)
+    )
+    await worker.store("Which banks do you support?", "Bank A")
+    await worker.store("How do transfers work?", "Instantly")  # evicts locally
+
+    # Similar questions are matched per worker; exact ones through Redis
+    assert await worker.lookup("Which banks do you support?") == "Bank A"
+    assert await other_worker.lookup("Which banks do you support") == "Bank A"
+    assert await other_worker.lookup("How do transfers currently work?") is None
+
+    await worker.invalidate()
+    assert await other_worker.lookup("Which banks do you support?") is None